@@ -0,0 +1,50 @@
+"""
+Compare the cost to the caller of logging synchronously and in async mode.
+
+    python -m benchmarks.async_writer
+"""
+
+import logging
+import os
+import time
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.handlers import AsyncHandler
+
+from .common import DATA, report, typical_logger
+
+RECORDS = 20000
+
+
+def run(handler):
+    handler.setFormatter(JsonFormatter())
+    logger = logging.Logger("benchmark")
+    logger.addHandler(handler)
+    log = typical_logger(logger)
+
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        log.info("Priced vehicle %s", i, extra=DATA)
+    logged = time.perf_counter()
+    handler.flush()
+    drained = time.perf_counter()
+    handler.close()
+    return (logged - start) / RECORDS * 1e6, (drained - start) / RECORDS * 1e6
+
+
+def main():
+    rows = []
+    with open(os.devnull, "w") as stream:
+        for label, handler in (
+            ("sync", logging.StreamHandler(stream)),
+            ("async", AsyncHandler(stream, capacity=RECORDS)),
+        ):
+            caller, total = run(handler)
+            rows.append(
+                (label, "caller {0:.2f}us  total {1:.2f}us".format(caller, total))
+            )
+    report("Per log call, {0} records".format(RECORDS), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compare formatting buffered records one at a time with format_batch.
+
+    python -m benchmarks.batch
+"""
+
+from cazoo_logger.formatters import JsonFormatter
+
+from .common import per_call, report, typical_records
+
+BATCH = 100
+
+
+def main():
+    records = typical_records(BATCH)
+    # Records from a hand-built adapter, with a context but no cached encoding.
+    bare = typical_records(BATCH)
+    for record in bare:
+        del record._context_fragment
+
+    rows = []
+    for encoder in ("json", "auto"):
+        formatter = JsonFormatter(encoder=encoder)
+        for label, batch in (("cached context", records), ("bare context", bare)):
+            loop = per_call(
+                lambda: "".join(formatter.format(r) + "\n" for r in batch), 200
+            )
+            batched = per_call(lambda: formatter.format_batch(batch), 200)
+            rows.append(
+                (
+                    "{0} {1}".format(encoder, label),
+                    "loop {0:.2f}us  batch {1:.2f}us per record".format(
+                        loop / BATCH, batched / BATCH
+                    ),
+                )
+            )
+    report("Formatting {0} records".format(BATCH), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Compare writing lines through a text stream with the bytes-native handler.
+
+    python -m benchmarks.binary_output
+"""
+
+import logging
+import os
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.handlers import BinaryStreamHandler
+
+from .common import per_call, report, typical_records
+
+
+def main():
+    [record] = typical_records()
+    rows = []
+    with open(os.devnull, "w") as text, open(os.devnull, "wb") as binary:
+        for encoder in ("json", "auto"):
+            formatter = JsonFormatter(encoder=encoder)
+            for label, handler in (
+                ("text", logging.StreamHandler(text)),
+                ("binary", BinaryStreamHandler(binary)),
+            ):
+                handler.setFormatter(formatter)
+                cost = per_call(lambda: handler.handle(record))
+                rows.append(
+                    ("{0} {1}".format(encoder, label), "{0:.2f}us".format(cost))
+                )
+    report("Handler.handle per record", rows)
+
+
+if __name__ == "__main__":
+    main()
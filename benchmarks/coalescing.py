@@ -0,0 +1,31 @@
+"""
+Compare a write per record with coalesced writes, to a real file descriptor.
+
+    python -m benchmarks.coalescing
+"""
+
+import os
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.handlers import BinaryStreamHandler, CoalescingHandler
+
+from .common import per_call, report, typical_records
+
+
+def main():
+    [record] = typical_records()
+    rows = []
+    with open(os.devnull, "wb", buffering=0) as stream:
+        for label, handler in (
+            ("write per record", BinaryStreamHandler(stream)),
+            ("coalesced", CoalescingHandler(stream, binary=True, max_age=60)),
+        ):
+            handler.setFormatter(JsonFormatter())
+            cost = per_call(lambda: handler.handle(record))
+            handler.flush()
+            rows.append((label, "{0:.2f}us".format(cost)))
+    report("Handler.handle per record, unbuffered stream", rows)
+
+
+if __name__ == "__main__":
+    main()
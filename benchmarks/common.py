@@ -0,0 +1,97 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run a benchmark from the repository root, e.g.
+
+    python -m benchmarks.encoders
+"""
+
+import logging
+import timeit
+import tracemalloc
+from collections import ChainMap
+
+from cazoo_logger import contexts
+
+
+class LambdaContext:
+    aws_request_id = "c6af9ac6-7b61-11e6-9a41-93e812345678"
+    function_name = "vehicle-pricing-handler"
+    function_version = "42"
+
+
+SNS_EVENT = {
+    "Records": [
+        {
+            "Sns": {
+                "Type": "Notification",
+                "MessageId": "66591d01-0241-5751-bb17-486e5a6dcf91",
+                "TopicArn": "arn:aws:sns:eu-west-1:476912836688:sftp_drop_topic",
+                "Subject": "Amazon S3 Notification",
+            }
+        }
+    ]
+}
+
+DATA = {
+    "vehicle": {"vrm": "LP12 KZM", "make": "Ford", "model": "Focus", "price": 9995.0},
+    "attempt": 3,
+    "tags": ["retail", "priced", "published"],
+}
+
+
+def null_logger():
+    logger = logging.Logger("benchmark")
+    logger.addHandler(logging.NullHandler())
+    return logger
+
+
+def typical_logger(logger=None):
+    """An S3/SNS contextual logger, the most common shape in our lambdas."""
+    return contexts.S3SnsContext(SNS_EVENT, LambdaContext(), logger or null_logger())
+
+
+def typical_records(count=1, logger=None):
+    """Capture LogRecords produced by a typical logger, without writing them."""
+    records = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    target = logging.Logger("capture")
+    target.addHandler(Capture())
+    log = typical_logger(target)
+    for i in range(count):
+        log.info("Priced vehicle %s", i, extra=DATA)
+    return records
+
+
+def empty_logger(logger=None):
+    return contexts.ContextualAdapter(logger or null_logger(), ChainMap())
+
+
+def per_call(fn, number=20000, repeat=5):
+    """Best time per call of `fn`, in microseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def allocations(fn, number=1000):
+    """Average peak bytes allocated while running `fn` once."""
+    fn()
+    total = 0
+    for _ in range(number):
+        # Restarting clears the peak, tracemalloc.reset_peak needs Python 3.9.
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total += peak
+    return total / number
+
+
+def report(title, rows):
+    print(title)
+    width = max(len(name) for name, _ in rows)
+    for name, value in rows:
+        print("  {0:<{1}}  {2}".format(name, width, value))
@@ -0,0 +1,29 @@
+"""
+Measure the saving from splicing the cached context encoding into each line.
+
+    python -m benchmarks.context_fragments
+"""
+
+from cazoo_logger.formatters import JsonFormatter
+
+from .common import per_call, report, typical_records
+
+
+def main():
+    [record] = typical_records()
+    cached = record.__dict__.copy()
+    uncached = record.__dict__.copy()
+    del uncached["_context_fragment"]
+
+    rows = []
+    for encoder in ("json", "auto"):
+        formatter = JsonFormatter(encoder=encoder)
+        for label, attrs in (("uncached", uncached), ("cached", cached)):
+            record.__dict__ = attrs
+            cost = per_call(lambda: formatter.format(record))
+            rows.append(("{0} {1}".format(encoder, label), "{0:.2f}us".format(cost)))
+    report("JsonFormatter.format per record", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Compare the JSON encoder backends on typical log records.
+
+    python -m benchmarks.encoders
+"""
+
+from cazoo_logger.encoders import available_encoders
+from cazoo_logger.formatters import JsonFormatter
+
+from .common import per_call, report, typical_records
+
+
+def main():
+    [record] = typical_records()
+    rows = []
+    baseline = None
+    for name in ["json", "auto"] + available_encoders()[1:]:
+        formatter = JsonFormatter(encoder=name)
+        cost = per_call(lambda: formatter.format(record))
+        baseline = baseline or cost
+        label = "{0} ({1})".format(name, type(formatter.encoder).__name__)
+        rows.append((label, "{0:.2f}us  x{1:.2f}".format(cost, baseline / cost)))
+    report("JsonFormatter.format per record", rows)
+
+
+if __name__ == "__main__":
+    main()
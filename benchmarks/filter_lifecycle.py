@@ -0,0 +1,60 @@
+"""
+Measure the cost of a log call inside handlers decorated with a log filter, over
+many warm invocations. It should not grow as the container handles more requests.
+
+    python -m benchmarks.filter_lifecycle
+"""
+
+import logging
+import os
+import sys
+import time
+
+from cazoo_logger import lambda_support
+
+from .common import DATA, SNS_EVENT, LambdaContext, report
+
+INVOCATIONS = 10000
+CALLS = 10
+
+
+class PassFilter(logging.Filter):
+    def filter(self, record):
+        return True
+
+
+@lambda_support.handler_logger("s3", log_filter=PassFilter)
+def handler(event, context, log):
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        log.info("Priced vehicle", extra=DATA)
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def main():
+    context = LambdaContext()
+    stderr = sys.stderr
+    costs = []
+    with open(os.devnull, "w") as stream:
+        sys.stderr = stream
+        try:
+            for _ in range(INVOCATIONS):
+                costs.append(handler(SNS_EVENT, context))
+        finally:
+            sys.stderr = stderr
+            logging.root.handlers.clear()
+    rows = []
+    for start in (0, INVOCATIONS // 2, INVOCATIONS - 1000):
+        window = sorted(costs[start : start + 1000])
+        rows.append(
+            (
+                "invocations {0}-{1}".format(start, start + 1000),
+                "{0:.2f}us".format(window[len(window) // 2]),
+            )
+        )
+    rows.append(("filters attached after", str(len(logging.root.filters))))
+    report("log.info per call, median", rows)
+
+
+if __name__ == "__main__":
+    main()
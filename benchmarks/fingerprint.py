@@ -0,0 +1,54 @@
+"""
+Measure handler_logger invocations that receive the same 50KB event again, as
+retries and replays do, with and without `dedupe_events`.
+
+    python -m benchmarks.fingerprint
+"""
+
+import logging
+import os
+import sys
+
+from cazoo_logger import lambda_support
+
+from .common import LambdaContext, per_call, report
+
+EVENT = {
+    "source": "orders",
+    "detail-type": "Order placed",
+    "id": "a8b5c1f4",
+    "detail": {
+        "lines": [{"sku": "sku-{0}".format(i), "price": 99.0} for i in range(1000)]
+    },
+}
+
+
+def handler(event, context, log):
+    return None
+
+
+def main():
+    context = LambdaContext()
+    stderr = sys.stderr
+    with open(os.devnull, "w") as stream:
+        sys.stderr = stream
+        try:
+            full = lambda_support.handler_logger("cloudwatch")(handler)
+            deduped = lambda_support.handler_logger(
+                "cloudwatch", dedupe_events=True
+            )(handler)
+            rows = [
+                ("full event every time", per_call(lambda: full(EVENT, context), 500)),
+                ("dedupe_events", per_call(lambda: deduped(EVENT, context), 500)),
+            ]
+        finally:
+            sys.stderr = stderr
+            logging.root.handlers.clear()
+    report(
+        "Invocation with a repeated event",
+        [(label, "{0:.1f}us".format(cost)) for label, cost in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measure the Offloader: the cost it adds to typical records, which stay on the
+line, and to a large payload, first written and then deduplicated.
+
+    python -m benchmarks.offload
+"""
+
+import logging
+import tempfile
+
+from cazoo_logger.offload import LocalDirectorySink, Offloader
+
+from .common import DATA, per_call, report
+
+PAYLOAD = {"rows": [{"id": i, "name": "x" * 200} for i in range(5000)]}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        sink = LocalDirectorySink(directory)
+
+        def record(data):
+            return logging.makeLogRecord({"msg": "Exported", "data": data})
+
+        def first_write():
+            Offloader(sink, threshold=64 * 1024).filter(record({"payload": PAYLOAD}))
+
+        offloader = Offloader(sink, threshold=64 * 1024)
+        rows = [
+            ("typical record", per_call(lambda: offloader.filter(record(DATA)))),
+            ("1MB payload, written", per_call(first_write, number=5)),
+            (
+                "1MB payload, deduplicated",
+                per_call(lambda: offloader.filter(record({"payload": PAYLOAD})), 20),
+            ),
+        ]
+    report(
+        "Offloader per record",
+        [(label, "{0:.1f}us".format(cost)) for label, cost in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
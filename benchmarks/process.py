@@ -0,0 +1,36 @@
+"""
+Measure the time and memory ContextualAdapter.process takes per call, for calls
+without extra, with extra, with a type, and with both.
+
+    python -m benchmarks.process
+"""
+
+from .common import DATA, allocations, per_call, report, typical_logger
+
+CALLS = {
+    "no extra": {},
+    "extra": {"extra": DATA},
+    "type": {"type": "vehicle-priced"},
+    "extra and type": {"extra": DATA, "type": "vehicle-priced"},
+}
+
+
+def main():
+    log = typical_logger()
+    rows = []
+    for label, kwargs in CALLS.items():
+
+        def call(kwargs=kwargs):
+            log.process("Priced vehicle", dict(kwargs))
+
+        rows.append(
+            (
+                label,
+                "{0:.2f}us, {1:.0f} bytes".format(per_call(call), allocations(call)),
+            )
+        )
+    report("process per call", rows)
+
+
+if __name__ == "__main__":
+    main()
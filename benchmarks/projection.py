@@ -0,0 +1,66 @@
+"""
+Measure logging a large EventBridge event in full, against projecting a few
+fields out of it first, as the decorators do with `event_fields`.
+
+    python -m benchmarks.projection
+"""
+
+import json
+import logging
+import os
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.projection import compile_projection
+
+from .common import per_call, report, typical_logger
+
+EVENT = {
+    "source": "stock",
+    "detail-type": "Stock exported",
+    "id": "a8b5c1f4",
+    "detail": {
+        "export": {"id": "export-42", "count": 2000},
+        "vehicles": [
+            {
+                "vrm": "LP12 KZM",
+                "make": "Ford",
+                "model": "Focus",
+                "features": ["bluetooth", "cruise control", "parking sensors"] * 5,
+                "price": 9995.0,
+            }
+            for _ in range(2000)
+        ],
+    },
+}
+
+
+def main():
+    with open(os.devnull, "w") as stream:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        logger = logging.getLogger("benchmark.projection")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        log = typical_logger(logger)
+        project = compile_projection(["id", "detail-type", "detail.export"])
+
+        def full():
+            log.info("Logging event data", extra={"event": EVENT})
+
+        def projected():
+            log.info("Logging event data", extra={"event": project(EVENT)})
+
+        rows = [
+            ("full event", per_call(full, number=20)),
+            ("projected", per_call(projected, number=2000)),
+        ]
+    size = len(json.dumps(EVENT)) // 1024
+    report(
+        "Log a {0}KB event".format(size),
+        [(label, "{0:.1f}us".format(cost)) for label, cost in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
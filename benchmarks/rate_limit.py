@@ -0,0 +1,29 @@
+"""
+Measure the cost of the rate limiting filter on allowed and suppressed records.
+
+    python -m benchmarks.rate_limit
+"""
+
+from cazoo_logger.filters import RateLimitFilter
+
+from .common import per_call, report, typical_records
+
+
+def main():
+    [record] = typical_records()
+    allowing = RateLimitFilter(rate=1e9, burst=1e9)
+    suppressing = RateLimitFilter(rate=0, burst=1, summary_interval=1e9)
+    report(
+        "RateLimitFilter.filter per record",
+        [
+            ("allowed", "{0:.3f}us".format(per_call(lambda: allowing.filter(record)))),
+            (
+                "suppressed",
+                "{0:.3f}us".format(per_call(lambda: suppressing.filter(record))),
+            ),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
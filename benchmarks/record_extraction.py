@@ -0,0 +1,55 @@
+"""
+Compare reading attributes off the record with copying record.__dict__.
+
+    python -m benchmarks.record_extraction
+"""
+
+from cazoo_logger.formatters import JsonFormatter
+
+from .common import allocations, per_call, report, typical_records
+
+SUPPORTED = {"level", "context", "data", "type"}
+
+
+def copy_and_filter(record):
+    """The extraction JsonFormatter used to do."""
+    record_dict = record.__dict__.copy()
+    log_dict = {k: v for k, v in record_dict.items() if k in SUPPORTED and v}
+    log_dict["msg"] = record.getMessage()
+    log_dict["level"] = record.levelname.lower()
+    return log_dict
+
+
+def read_attributes(record):
+    log_dict = {}
+    for name in ("context", "data", "type"):
+        value = getattr(record, name, None)
+        if value:
+            log_dict[name] = value
+    log_dict["msg"] = record.getMessage()
+    log_dict["level"] = record.levelname.lower()
+    return log_dict
+
+
+def main():
+    [record] = typical_records()
+    # Compare without the cached context, so both sides encode the same dict.
+    del record._context_fragment
+    formatter = JsonFormatter()
+    rows = []
+    for name, fn in (
+        ("copy record.__dict__", lambda: copy_and_filter(record)),
+        ("read attributes", lambda: read_attributes(record)),
+        ("JsonFormatter.format", lambda: formatter.format(record)),
+    ):
+        rows.append(
+            (
+                name,
+                "{0:.2f}us  {1:.0f} bytes".format(per_call(fn), allocations(fn)),
+            )
+        )
+    report("Per record extraction", rows)
+
+
+if __name__ == "__main__":
+    main()
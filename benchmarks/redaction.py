@@ -0,0 +1,110 @@
+"""
+Measure redacting a large event logged by handler_logger, with the PiiFilter from
+the tests, which deep copies every attribute of the record, against a
+RedactionFilter for the same fields. Then measure scrubbing strings with the
+default patterns one at a time, combined into one expression, and cached, and
+the cost of a pseudonymised token for a value that recurs.
+
+    python -m benchmarks.redaction
+"""
+
+import logging
+import re
+
+from cazoo_logger.redaction import (
+    DEFAULT_PATTERNS,
+    Pseudonymiser,
+    RedactionFilter,
+    Redactor,
+)
+from test.pii_cleaner import PII_FIELDS, PiiFilter
+
+from .common import per_call, report, typical_logger
+
+EVENT = {
+    "source": "orders",
+    "detail-type": "Orders exported",
+    "id": "a8b5c1f4",
+    "detail": {
+        "orders": [
+            {
+                "id": i,
+                "customer": {
+                    "first_name": "Ada",
+                    "surname": "Lovelace",
+                    "email_address": "ada@example.com",
+                },
+                "vehicle": {"vrm": "LP12 KZM", "make": "Ford", "model": "Focus"},
+                "lines": [{"sku": "warranty", "price": 299.0}] * 5,
+            }
+            for i in range(100)
+        ]
+    },
+}
+
+
+def main():
+    log = typical_logger()
+    _, kwargs = log.process("Logging event data", {"extra": {"event": EVENT}})
+    attributes = dict(kwargs["extra"], msg="Logging event data")
+
+    def record():
+        return logging.makeLogRecord(attributes)
+
+    naive = PiiFilter()
+    redaction = RedactionFilter(Redactor(fields=PII_FIELDS))
+    rows = [
+        ("record only", per_call(record, number=200)),
+        ("PiiFilter", per_call(lambda: naive.filter(record()), number=200)),
+        ("RedactionFilter", per_call(lambda: redaction.filter(record()), number=200)),
+    ]
+    report(
+        "Redact a 100 order event, per record",
+        [(label, "{0:.1f}us".format(cost)) for label, cost in rows],
+    )
+
+    texts = [
+        "Emailed receipt to ada@example.com",
+        "Priced vehicle",
+        "Delivery booked for SW1A 1AA",
+        "Reserved LP12 KZM for customer 12345",
+        "ok",
+    ]
+    separate = [
+        (re.compile(pattern), replace)
+        for pattern, replace in DEFAULT_PATTERNS.values()
+    ]
+
+    def one_at_a_time():
+        for text in texts:
+            for pattern, replace in separate:
+                text = pattern.sub(
+                    (lambda m, r=replace: r(m.group()) if callable(r) else r), text
+                )
+
+    redactor = Redactor(patterns=True)
+    uncached = Redactor(patterns=True, cache_size=0)
+    rows = [
+        ("one pattern at a time", per_call(one_at_a_time)),
+        ("combined, uncached", per_call(lambda: [uncached.scrub(t) for t in texts])),
+        ("combined, cached", per_call(lambda: [redactor.scrub(t) for t in texts])),
+    ]
+    report(
+        "Scrub {0} log strings".format(len(texts)),
+        [(label, "{0:.2f}us".format(cost)) for label, cost in rows],
+    )
+
+    cached = Pseudonymiser(key="benchmark")
+    uncached = Pseudonymiser(key="benchmark", cache_size=0)
+    rows = [
+        ("uncached", per_call(lambda: uncached("ada@example.com"))),
+        ("cached", per_call(lambda: cached("ada@example.com"))),
+    ]
+    report(
+        "Pseudonymise a recurring value",
+        [(label, "{0:.2f}us".format(cost)) for label, cost in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
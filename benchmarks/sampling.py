@@ -0,0 +1,34 @@
+"""
+Measure the cost of an info call in sampled-in and sampled-out invocations.
+
+    python -m benchmarks.sampling
+"""
+
+import logging
+import os
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.sampling import sampled_level
+
+from .common import DATA, per_call, report, typical_logger
+
+
+def main():
+    with open(os.devnull, "w") as stream:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        logger = logging.getLogger("benchmark.sampling")
+        logger.propagate = False
+        logger.addHandler(handler)
+        log = typical_logger(logger)
+
+        rows = []
+        for label, rate in (("sampled in", 1), ("sampled out", 0)):
+            logger.setLevel(sampled_level("INFO", "request-id", rate))
+            cost = per_call(lambda: log.info("Priced vehicle", extra=DATA))
+            rows.append((label, "{0:.2f}us".format(cost)))
+    report("log.info per call", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare a compiled schema with the generic JsonFormatter layout, and with the
+original loop over record.__dict__.
+
+    python -m benchmarks.schema
+"""
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.schema import DEFAULT_SCHEMA, Field, Schema
+
+from .common import per_call, report, typical_records
+from .record_extraction import copy_and_filter
+
+RENAMED = Schema(
+    Field("context"),
+    Field("message", source="msg", optional=False),
+    Field("severity", source="level", optional=False),
+    Field("payload", source="data"),
+)
+
+
+def main():
+    [record] = typical_records()
+    rows = []
+    for encoder in ("json", "auto"):
+        original = JsonFormatter(encoder=encoder).encoder
+        rows.append(
+            (
+                "{0} original loop".format(encoder),
+                per_call(lambda: original.dumps(copy_and_filter(record))),
+            )
+        )
+        for label, schema in (
+            ("generic", None),
+            ("DEFAULT_SCHEMA", DEFAULT_SCHEMA),
+            ("renamed schema", RENAMED),
+        ):
+            formatter = JsonFormatter(encoder=encoder, schema=schema)
+            cost = per_call(lambda: formatter.format(record))
+            rows.append(("{0} {1}".format(encoder, label), cost))
+    report(
+        "JsonFormatter.format per record",
+        [(name, "{0:.2f}us".format(cost)) for name, cost in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the json_default type registry with an if/elif chain of isinstance checks.
+
+    python -m benchmarks.serialisers
+"""
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import uuid
+
+from cazoo_logger.serialisers import json_default
+
+from .common import per_call, report
+
+
+class Colour(enum.Enum):
+    RED = "red"
+
+
+@dataclasses.dataclass
+class Vehicle:
+    vrm: str
+
+
+VALUES = [
+    datetime.datetime(2020, 1, 2, 3, 4, 5),
+    decimal.Decimal("9995.10"),
+    uuid.UUID("66591d01-0241-5751-bb17-486e5a6dcf91"),
+    Colour.RED,
+    {"a", "b"},
+    b"bytes",
+    Vehicle("LP12 KZM"),
+]
+
+
+def if_elif(obj):
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    elif isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    elif isinstance(obj, enum.Enum):
+        return obj.value
+    elif isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    elif isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8", "backslashreplace")
+    elif dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+def main():
+    rows = []
+    for value in VALUES:
+        name = type(value).__name__
+        rows.append(("{0} str()".format(name), per_call(lambda: str(value))))
+        rows.append(("{0} if/elif".format(name), per_call(lambda: if_elif(value))))
+        rows.append(
+            ("{0} registry".format(name), per_call(lambda: json_default(value)))
+        )
+    report(
+        "Per value", [(name, "{0:.3f}us".format(cost)) for name, cost in rows]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Compare formatting with timestamps off, on, and the stdlib formatTime.
+
+    python -m benchmarks.timestamps
+"""
+
+import logging
+
+from cazoo_logger.formatters import JsonFormatter, TimestampFormatter
+
+from .common import per_call, report, typical_records
+
+
+def main():
+    [record] = typical_records()
+    stdlib = logging.Formatter()
+    timestamps = TimestampFormatter("us")
+    rows = [
+        ("Formatter.formatTime", per_call(lambda: stdlib.formatTime(record))),
+        ("TimestampFormatter", per_call(lambda: timestamps(record.created))),
+    ]
+    for timestamp in (None, "ms"):
+        formatter = JsonFormatter(timestamp=timestamp)
+        label = "JsonFormatter(timestamp={0!r})".format(timestamp)
+        rows.append((label, per_call(lambda: formatter.format(record))))
+    report("Per record", [(name, "{0:.2f}us".format(cost)) for name, cost in rows])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Measure formatting a record with an oversized payload with and without a line
+budget, and the overhead of the budget on a typical record.
+
+    python -m benchmarks.truncation
+"""
+
+from cazoo_logger.formatters import JsonFormatter
+
+from .common import per_call, report, typical_logger, typical_records
+
+PAYLOAD = {
+    "rows": [{"id": i, "name": "x" * 200, "tags": ["a"] * 20} for i in range(20000)]
+}
+
+
+def main():
+    log = typical_logger()
+    plain = JsonFormatter()
+    budget = JsonFormatter(truncate=200 * 1024)
+
+    _, kwargs = log.process("Exported rows", {"extra": PAYLOAD})
+    [big] = typical_records()
+    big.data = kwargs["extra"]["data"]
+    [typical] = typical_records()
+
+    rows = [
+        ("oversized, no budget", per_call(lambda: plain.format(big), number=5)),
+        ("oversized, 200KB budget", per_call(lambda: budget.format(big), number=50)),
+        ("typical, no budget", per_call(lambda: plain.format(typical))),
+        ("typical, 200KB budget", per_call(lambda: budget.format(typical))),
+    ]
+    size = len(plain.format(big)) // 1024
+    report(
+        "format per record ({0}KB oversized line)".format(size),
+        [(label, "{0:.1f}us".format(cost)) for label, cost in rows],
+    )
+
+
+if __name__ == "__main__":
+    main()
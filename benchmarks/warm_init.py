@@ -0,0 +1,44 @@
+"""
+Measure the cost of setting up the logger on a warm invocation, when the handler
+and formatter are reused, against building them again every time.
+
+    python -m benchmarks.warm_init
+"""
+
+import logging
+import os
+import sys
+
+import cazoo_logger
+from cazoo_logger.lambda_support import LoggerProvider
+
+from .common import SNS_EVENT, LambdaContext, per_call, report
+
+
+def main():
+    context = LambdaContext()
+    stderr = sys.stderr
+    with open(os.devnull, "w") as stream:
+        sys.stderr = stream
+        try:
+
+            def warm():
+                LoggerProvider.init_logger(SNS_EVENT, context, "s3")
+
+            def cold():
+                cazoo_logger._configured = None
+                LoggerProvider.init_logger(SNS_EVENT, context, "s3")
+
+            rows = [
+                ("rebuilt", "{0:.2f}us".format(per_call(cold))),
+                ("reused", "{0:.2f}us".format(per_call(warm))),
+            ]
+        finally:
+            sys.stderr = stderr
+            logging.root.handlers.clear()
+            cazoo_logger._configured = None
+    report("init_logger per invocation", rows)
+
+
+if __name__ == "__main__":
+    main()
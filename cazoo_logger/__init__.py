@@ -1,6 +1,16 @@
 import logging
+import sys
 from ._version import get_versions
+from .filters import RateLimitFilter
 from .formatters import JsonFormatter
+from .redaction import RedactionFilter, Redactor
+from .handlers import (
+    AsyncHandler,
+    BinaryStreamHandler,
+    CoalescingHandler,
+    FlightRecorder,
+    RepeatCollapser,
+)
 from . import contexts
 from .logging_levels import add_logging_level
 from collections import ChainMap
@@ -8,7 +18,11 @@ from collections import ChainMap
 __version__ = get_versions()["version"]
 del get_versions
 
-__all__ = ["empty", "s3", "cloudwatch", "config", "add_logging_level"]
+__all__ = ["empty", "s3", "cloudwatch", "config", "set_level", "add_logging_level"]
+
+# The settings and handler of the last call to config(), so that calling it again
+# with the same settings, e.g. on every warm invocation, reuses the handler.
+_configured = None
 
 
 def s3(event, context, service=None):
@@ -25,16 +39,187 @@ def cloudwatch(event, context, service=None):
     return contexts.CloudwatchContext(event, context, logging.root, service)
 
 
-def config(stream=None, level=logging.INFO, boto_level=logging.WARN):
-    stdout = logging.StreamHandler(stream)
-    stdout.setLevel(level)
-    stdout.setFormatter(JsonFormatter())
-    logging.root.setLevel(level)
-    logging.root.handlers.clear()
-    logging.root.addHandler(stdout)
-    logging.getLogger("boto").setLevel(boto_level)
-    logging.getLogger("botocore").setLevel(boto_level)
-    logging.getLogger("boto3").setLevel(boto_level)
+def config(
+    stream=None,
+    level=logging.INFO,
+    boto_level=logging.WARN,
+    encoder="json",
+    timestamp=None,
+    schema=None,
+    binary=False,
+    async_mode=False,
+    queue_size=10000,
+    overflow="block",
+    overflow_level=logging.WARNING,
+    coalesce=False,
+    coalesce_bytes=64 * 1024,
+    coalesce_seconds=1.0,
+    flight_recorder=0,
+    flight_recorder_level=logging.DEBUG,
+    rate_limit=0,
+    rate_limit_burst=10,
+    collapse_repeats=False,
+    redact=None,
+    truncate=None,
+    offload=None,
+):
+    """
+    Configure the root logger to write JSON lines.
+
+    Calling config() again with the same settings keeps the handler and formatter
+    it built last time, and only updates the level. That makes it cheap to call
+    on every invocation.
+
+    :param stream: The stream to write to. Defaults to stderr, or stdout when
+                   `binary` is set.
+    :param level: The minimum level to log.
+    :param boto_level: The minimum level for the boto libraries, which are noisy.
+    :param encoder: The JSON encoder backend, see `cazoo_logger.encoders`.
+    :param timestamp: Add a timestamp field with "s", "ms" or "us" precision.
+    :param schema: A `cazoo_logger.schema.Schema` declaring the output layout.
+    :param binary: Encode lines to UTF-8 once in the formatter and write them to a
+                   binary stream, rather than going through a text stream.
+    :param async_mode: Format and write records on a background thread. The
+                       lambda decorators wait for it to catch up before the
+                       handler returns.
+    :param queue_size: How many records async mode holds before the overflow
+                       policy applies.
+    :param overflow: What async mode does when the queue is full: "block",
+                     "drop_newest", "drop_oldest", or "drop_below" to drop only
+                     records below `overflow_level`. Dropped records are counted
+                     and summarised at the end of the invocation.
+    :param overflow_level: The level below which "drop_below" drops records.
+    :param coalesce: Hold lines in memory and write them out together once they
+                     reach `coalesce_bytes` or `coalesce_seconds`, when an error
+                     is logged, and at the end of the invocation.
+    :param flight_recorder: Keep up to this many records between
+                            `flight_recorder_level` and `level` in memory, and
+                            write them only if the invocation logs an error.
+    :param rate_limit: Allow each message template this many records per second,
+                       after a burst of `rate_limit_burst`, and log summaries of
+                       the records suppressed.
+    :param collapse_repeats: Write runs of identical records as one line with a
+                             "repeat" field holding the count and the times of
+                             the first and last.
+    :param redact: A `cazoo_logger.redaction.Redactor`, or field names to redact,
+                   run over the data and context of every record.
+    :param truncate: A byte budget for each line, or a
+                     `cazoo_logger.truncation.Truncator`. Data that doesn't fit
+                     is cut down.
+    :param offload: A `cazoo_logger.offload.Offloader`, which writes data values
+                    too big for a line elsewhere and logs a pointer to them.
+    """
+    settings = dict(locals())
+    del settings["level"]
+    if stream is None:
+        # The handlers pick their default stream when they are built.
+        settings["stream"] = (sys.stdout, sys.stderr)
+
+    global _configured
+    if (
+        _configured is not None
+        and _configured[0] == settings
+        and logging.root.handlers == [_configured[1]]
+    ):
+        handler = _configured[1]
+    else:
+        handler = _build_handler(**dict(settings, stream=stream))
+        for old in logging.root.handlers:
+            old.close()
+        logging.root.handlers.clear()
+        logging.root.addHandler(handler)
+        logging.getLogger("boto").setLevel(boto_level)
+        logging.getLogger("botocore").setLevel(boto_level)
+        logging.getLogger("boto3").setLevel(boto_level)
+        _configured = (settings, handler)
+    _set_level(handler, level)
+
+
+def set_level(level):
+    """
+    Change the level of the handler config() installed, keeping the rest of its
+    settings. When there is none, configure the root logger with the defaults.
+    :param level: The minimum level to log.
+    """
+    if _configured is not None and _configured[1] in logging.root.handlers:
+        _set_level(_configured[1], level)
+    else:
+        config(level=level)
+
+
+def _set_level(handler, level):
+    level = logging._checkLevel(level)
+    if isinstance(handler, FlightRecorder):
+        handler.record_level = level
+        level = min(handler.level, level)
+    else:
+        handler.setLevel(level)
+    if logging.root.level != level:
+        # Setting the level clears every logger's cache, so only do it if needed.
+        logging.root.setLevel(level)
+
+
+def _build_handler(
+    stream,
+    binary,
+    async_mode,
+    queue_size,
+    overflow,
+    overflow_level,
+    coalesce,
+    coalesce_bytes,
+    coalesce_seconds,
+    encoder,
+    timestamp,
+    schema,
+    collapse_repeats,
+    flight_recorder,
+    flight_recorder_level,
+    rate_limit,
+    rate_limit_burst,
+    redact,
+    truncate,
+    offload,
+    **_
+):
+    if async_mode and coalesce:
+        raise ValueError("Async mode already batches writes, it can't coalesce")
+    if coalesce:
+        stdout = CoalescingHandler(
+            stream, binary, max_bytes=coalesce_bytes, max_age=coalesce_seconds
+        )
+    elif async_mode:
+        stdout = AsyncHandler(
+            stream,
+            binary,
+            capacity=queue_size,
+            overflow=overflow,
+            overflow_level=overflow_level,
+        )
+    elif binary:
+        stdout = BinaryStreamHandler(stream)
+    else:
+        stdout = logging.StreamHandler(stream)
+    stdout.setFormatter(
+        JsonFormatter(
+            encoder=encoder, timestamp=timestamp, schema=schema, truncate=truncate
+        )
+    )
+    if collapse_repeats:
+        stdout = RepeatCollapser(stdout)
+    if flight_recorder:
+        stdout = FlightRecorder(stdout, capacity=flight_recorder)
+        stdout.setLevel(flight_recorder_level)
+    if rate_limit:
+        stdout.addFilter(RateLimitFilter(rate=rate_limit, burst=rate_limit_burst))
+    if redact:
+        if not isinstance(redact, Redactor):
+            redact = Redactor(fields=redact)
+        stdout.addFilter(RedactionFilter(redact))
+    if offload is not None:
+        # After redaction, so personal data isn't offloaded either.
+        stdout.addFilter(offload)
+    return stdout
 
 
 def empty():
@@ -2,10 +2,152 @@ import logging
 from collections import ChainMap
 
 
+def _copy(value):
+    # Dicts and lists are copied, anything else is compared as it is.
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+class ContextFragment:
+    """
+    The context block of a logger together with its encoded JSON.
+
+    The context rarely changes for the lifetime of an adapter, so the formatter
+    encodes it once per encoder and splices the cached text into every line. A
+    copy of what was encoded is kept, and the context is encoded again if it no
+    longer matches, e.g. after `log.context["context"]["order_id"] = ...`.
+    """
+
+    __slots__ = ("context", "_encoded", "_text", "_bytes")
+
+    def __init__(self, context):
+        self.context = context
+        self._encoded = None
+        self._text = self._bytes = (None, None)
+
+    def _check(self):
+        # Comparing is much cheaper than encoding, and it's the only way to see
+        # changes made in place.
+        if self._encoded != self.context:
+            self._encoded = _copy(self.context)
+            self._text = self._bytes = (None, None)
+
+    def encode(self, encoder):
+        self._check()
+        cached_encoder, text = self._text
+        if cached_encoder is not encoder:
+            text = encoder.dumps(self.context)
+            self._text = (encoder, text)
+        return text
+
+    def encode_bytes(self, encoder):
+        self._check()
+        cached_encoder, data = self._bytes
+        if cached_encoder is not encoder:
+            data = encoder.dumpb(self.context)
+            self._bytes = (encoder, data)
+        return data
+
+
+class ContextMap(ChainMap):
+    """
+    A ChainMap that counts the changes made through it, so an adapter can tell
+    when its flattened copy is out of date. Maps derived with `new_child` or
+    `parents` share the count, so a change to a parent is seen by its children.
+    """
+
+    def __init__(self, *maps):
+        super().__init__(*maps)
+        self.changes = [0]
+
+    def _derived(self, other):
+        other.changes = self.changes
+        return other
+
+    def new_child(self, m=None):
+        return self._derived(super().new_child(m))
+
+    @property
+    def parents(self):
+        return self._derived(super().parents)
+
+    def copy(self):
+        return self._derived(super().copy())
+
+    __copy__ = copy
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.changes[0] += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.changes[0] += 1
+
+    def pop(self, key, *args):
+        self.changes[0] += 1
+        return super().pop(key, *args)
+
+    def popitem(self):
+        self.changes[0] += 1
+        return super().popitem()
+
+    def clear(self):
+        self.changes[0] += 1
+        super().clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
 class ContextualAdapter(logging.LoggerAdapter):
     def __init__(self, logger, data=None):
-        self.context = data
         super().__init__(logger, data)
+        self.context = data
+
+    @property
+    def context(self):
+        """
+        The context added to every record. Change it through this mapping, e.g.
+        `log.context["context"]["order_id"] = ...`, and the next record has it.
+        """
+        return self._context
+
+    @context.setter
+    def context(self, data):
+        if data is not None and not isinstance(data, ContextMap):
+            data = (
+                ContextMap(*data.maps)
+                if isinstance(data, ChainMap)
+                else ContextMap(data)
+            )
+        self._context = self.extra = data
+        self._flat = (None, {})
+
+    @property
+    def _flat_context(self):
+        # Logging reads a dict faster than a ChainMap, and every call reads it, so
+        # the context is flattened, and only again once it has changed. The flat
+        # copy also carries the cached encoding of the context block, which is
+        # kept out of `context`.
+        context = self._context
+        if context is None:
+            return self._flat[1]
+        changes, flat = self._flat
+        if changes != context.changes[0]:
+            old = flat.get("_context_fragment")
+            flat = dict(context)
+            block = flat.get("context")
+            if isinstance(block, dict):
+                if old is None or old.context is not block:
+                    old = ContextFragment(block)
+                flat["_context_fragment"] = old
+            self._flat = (context.changes[0], flat)
+        return flat
 
     def with_context(self, **ctx):
         new_ctx = self.context.new_child()
@@ -18,22 +160,29 @@ class ContextualAdapter(logging.LoggerAdapter):
         return ContextualAdapter(self.logger, new_ctx)
 
     def process(self, msg, kwargs):
-        if "extra" in kwargs:
-            extra = kwargs["extra"].copy()
-            del kwargs["extra"]
-            kwargs["extra"] = {"data": extra}
-            kwargs["extra"].update(self.context)
+        # The flat context is shared by every call, so it is only ever read.
+        # Without extra or type it is passed on as it is, otherwise it is copied
+        # into a new dict for this record.
+        extra = kwargs.pop("extra", None)
+        type_ = kwargs.pop("type", None)
+        if extra is not None:
+            # The context's own data, from with_data, wins over extra.
+            kwargs["extra"] = {"data": extra.copy(), **self._flat_context}
+            if type_ is not None:
+                kwargs["extra"]["type"] = type_
+        elif type_ is not None:
+            kwargs["extra"] = {**self._flat_context, "type": type_}
         else:
-            kwargs["extra"] = self.context
-
-        if "type" in kwargs:
-            kwargs["extra"]["type"] = kwargs.pop("type")
+            kwargs["extra"] = self._flat_context
 
         return msg, kwargs
 
     def addFilter(self, filter):
         self.logger.addFilter(filter)
 
+    def removeFilter(self, filter):
+        self.logger.removeFilter(filter)
+
 
 class LambdaContext(ContextualAdapter):
     def __init__(self, context, data, logger, service=None):
@@ -51,7 +200,7 @@ class LambdaContext(ContextualAdapter):
         default["context"].update(data)
         if service is not None:
             default["context"]["function"]["service"] = service
-        super().__init__(logger, ChainMap(default))
+        super().__init__(logger, ContextMap(default))
 
 
 class S3SnsContext(LambdaContext):
@@ -0,0 +1,161 @@
+"""
+ENCODERS
+This module provides the JSON encoder backends used by the JsonFormatter.
+
+StdlibEncoder
+Encodes with the standard library json module. By default it writes exactly what
+`json.dumps` writes, so the formatter's output is unchanged.
+
+OrjsonEncoder, UjsonEncoder, RapidjsonEncoder
+Accelerated backends, available when the matching package is installed. They
+always write compact, UTF-8 JSON and fall back to a compact StdlibEncoder for any
+value they cannot encode, so every line from one formatter has the same layout.
+A compact StdlibEncoder writes byte-identical output for the same records, with
+the exception of non-finite floats and floats in exponent notation, which the
+accelerated libraries spell differently.
+
+get_encoder
+Returns an encoder by name. "auto" picks the fastest installed backend, or a
+compact StdlibEncoder when none is installed.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+try:
+    import rapidjson
+except ImportError:  # pragma: no cover
+    rapidjson = None
+
+
+class StdlibEncoder:
+    """Encoder backed by the standard library json module."""
+
+    name = "json"
+
+    def __init__(self, default=None, compact=False):
+        self.default = default
+        self.compact = compact
+        if compact:
+            self.item_separator, self.key_separator = ",", ":"
+        else:
+            self.item_separator, self.key_separator = ", ", ": "
+        self._encoder = json.JSONEncoder(
+            default=default,
+            ensure_ascii=not compact,
+            separators=(self.item_separator, self.key_separator),
+        )
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj)
+
+    def dumpb(self, obj):
+        return self._encoder.encode(obj).encode("utf-8")
+
+
+class _AcceleratedEncoder:
+    """Base class for the optional backends.
+
+    Subclasses implement `_dumpb`, which may raise TypeError, ValueError or
+    OverflowError for values the library cannot encode; those records are
+    encoded by the compact stdlib fallback instead.
+    """
+
+    name = None
+    item_separator, key_separator = ",", ":"
+    compact = True
+
+    def __init__(self, default=None):
+        self.default = default
+        self.fallback = StdlibEncoder(default, compact=True)
+
+    def dumps(self, obj):
+        try:
+            return self._dumpb(obj).decode("utf-8")
+        except (TypeError, ValueError, OverflowError):
+            return self.fallback.dumps(obj)
+
+    def dumpb(self, obj):
+        try:
+            return self._dumpb(obj)
+        except (TypeError, ValueError, OverflowError):
+            return self.fallback.dumpb(obj)
+
+
+class OrjsonEncoder(_AcceleratedEncoder):
+    name = "orjson"
+
+    def __init__(self, default=None):
+        super().__init__(default)
+        # Hand datetimes and dataclasses to `default` like the stdlib does.
+        self._options = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+    def _dumpb(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self._options)
+
+
+class UjsonEncoder(_AcceleratedEncoder):
+    name = "ujson"
+
+    def _dumpb(self, obj):
+        return ujson.dumps(
+            obj,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+            default=self.default,
+        ).encode("utf-8")
+
+
+class RapidjsonEncoder(_AcceleratedEncoder):
+    name = "rapidjson"
+
+    def _dumpb(self, obj):
+        return rapidjson.dumps(obj, ensure_ascii=False, default=self.default).encode(
+            "utf-8"
+        )
+
+
+_backends = {
+    "orjson": (orjson, OrjsonEncoder),
+    "ujson": (ujson, UjsonEncoder),
+    "rapidjson": (rapidjson, RapidjsonEncoder),
+}
+
+
+def available_encoders():
+    """Return the names of the backends that can be used in this environment."""
+    return ["json"] + [name for name, (module, _) in _backends.items() if module]
+
+
+def get_encoder(name="json", default=None):
+    """
+    Build an encoder backend.
+    :param name: "json" for the stdlib encoder, "auto" for the fastest installed
+                 backend, or the name of a specific backend.
+    :param default: Called for values the backend cannot serialise. It must not
+                    throw.
+    """
+    if name == "json":
+        return StdlibEncoder(default)
+    if name == "auto":
+        for module, cls in _backends.values():
+            if module is not None:
+                return cls(default)
+        return StdlibEncoder(default, compact=True)
+    if name not in _backends:
+        raise ValueError("Unknown JSON encoder {0}".format(name))
+    module, cls = _backends[name]
+    if module is None:
+        raise ValueError("JSON encoder {0} is not installed".format(name))
+    return cls(default)
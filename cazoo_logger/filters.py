@@ -0,0 +1,107 @@
+"""
+FILTERS
+This module provides logging filters that config() can install.
+
+RateLimitFilter
+Limits how often each message template can be logged, with a token bucket per
+unformatted message and level. A warning in a tight loop is written a few times
+and then suppressed, and summaries of what was suppressed are logged every
+`summary_interval` seconds and at the end of the invocation.
+"""
+
+import logging
+import time
+from collections import ChainMap
+
+from .contexts import ContextualAdapter
+
+SUPPRESSED_MESSAGE = "Suppressed %d similar log messages"
+
+
+class RateLimitFilter(logging.Filter):
+    def __init__(
+        self,
+        rate=1.0,
+        burst=10,
+        summary_interval=60.0,
+        max_templates=10000,
+        logger=None,
+        clock=time.monotonic,
+    ):
+        """
+        :param rate: How many records per second each template may log, once its
+                     burst is used up.
+        :param burst: How many records a template may log in a row.
+        :param summary_interval: How often, in seconds, to log summaries of
+                                 suppressed records while logging continues.
+        :param max_templates: The most templates to track. Past it, tracking
+                              starts again from scratch, so messages built with
+                              f-strings can't grow the filter without limit.
+        :param logger: Where summaries are logged between invocations. Defaults
+                       to the root logger.
+        """
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.summary_interval = summary_interval
+        self.max_templates = max_templates
+        self.logger = logger
+        self.clock = clock
+        self._buckets = {}
+        self._suppressed = {}
+        self._last_summary = clock()
+
+    def filter(self, record):
+        msg = record.msg
+        if msg is SUPPRESSED_MESSAGE:
+            return True
+        key = (msg, record.levelno)
+        now = self.clock()
+        try:
+            bucket = self._buckets.get(key)
+        except TypeError:
+            # Any object can be logged as the message, e.g. a dict.
+            key = (str(msg), record.levelno)
+            bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_templates:
+                self._buckets.clear()
+            self._buckets[key] = [self.burst - 1, now]
+            allowed = True
+        else:
+            tokens = bucket[0] + (now - bucket[1]) * self.rate
+            if tokens > self.burst:
+                tokens = self.burst
+            bucket[1] = now
+            allowed = tokens >= 1
+            bucket[0] = tokens - 1 if allowed else tokens
+            if not allowed:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+
+        if self._suppressed and now - self._last_summary >= self.summary_interval:
+            logger = self.logger or logging.root
+            self.summarise(ContextualAdapter(logger, ChainMap()))
+        return allowed
+
+    def summarise(self, log):
+        """
+        Log a summary for each template suppressed since the last summary.
+        :param log: A ContextualAdapter to log the summaries with.
+        """
+        self._last_summary = self.clock()
+        suppressed, self._suppressed = self._suppressed, {}
+        for (msg, levelno), count in suppressed.items():
+            log.warning(
+                SUPPRESSED_MESSAGE,
+                count,
+                extra={
+                    "template": str(msg),
+                    "level": logging.getLevelName(levelno).lower(),
+                    "suppressed": count,
+                },
+                type="log-messages-suppressed",
+            )
+
+    def end_invocation(self, log):
+        if self._suppressed:
+            self.summarise(log)
@@ -0,0 +1,73 @@
+"""
+FINGERPRINT
+This module recognises events that have been logged before, so retried and
+replayed events are written out in full once per container rather than on every
+delivery.
+
+fingerprint
+A BLAKE2b hash of an event's JSON, with sorted keys, so equal events have equal
+fingerprints however their keys are ordered. Encoding the event costs far more
+than hashing it, so orjson is used when it is installed.
+
+EventFingerprints
+Remembers the fingerprints of the most recent `max_size` events it has seen.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+from .serialisers import json_default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_sorted = json.JSONEncoder(
+    default=json_default, check_circular=False, separators=(",", ":"), sort_keys=True
+)
+# Keys of mixed types can't be sorted.
+_unsorted = json.JSONEncoder(
+    default=json_default, check_circular=False, separators=(",", ":")
+)
+
+
+def _encode(event):
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                event, default=json_default, option=orjson.OPT_SORT_KEYS
+            )
+        except TypeError:
+            pass
+    try:
+        text = _sorted.encode(event)
+    except TypeError:
+        text = _unsorted.encode(event)
+    return text.encode("utf-8")
+
+
+def fingerprint(event):
+    """Return a hex digest identifying the content of `event`."""
+    return hashlib.blake2b(_encode(event), digest_size=16).hexdigest()
+
+
+class EventFingerprints:
+    def __init__(self, max_size=1024):
+        """
+        :param max_size: How many fingerprints to remember. The least recently
+                         seen is forgotten first.
+        """
+        self.max_size = max_size
+        self._seen = OrderedDict()
+
+    def first_seen(self, digest):
+        """Return True the first time `digest` is seen, then False."""
+        if digest in self._seen:
+            self._seen.move_to_end(digest)
+            return False
+        self._seen[digest] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
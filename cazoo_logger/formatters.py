@@ -1,5 +1,17 @@
-import json
 import logging
+import time
+
+from .contexts import ContextFragment
+from .encoders import get_encoder
+from .schema import compile_schema
+from .serialisers import json_default
+from .truncation import Truncator
+
+# The braces, and each key the formatter writes with its quotes and separators.
+_KEYS_SIZE = 2 + sum(
+    len(key) + 6
+    for key in ("context", "data", "type", "msg", "level", "timestamp", "repeat")
+)
 
 
 def json_formatter(obj):
@@ -7,6 +19,40 @@ def json_formatter(obj):
     return str(obj)
 
 
+class TimestampFormatter:
+    """
+    Formats record times as ISO-8601 UTC timestamps.
+
+    The whole-second part only changes once a second, so it is cached and each
+    record only pays for formatting its fractional suffix.
+    """
+
+    _fractions = {"s": (None, "Z"), "ms": (1000, ".%03dZ"), "us": (1, ".%06dZ")}
+
+    def __init__(self, precision="ms", datefmt=None):
+        if precision not in self._fractions:
+            raise ValueError("Invalid timestamp precision {0}".format(precision))
+        self._divisor, self._suffix = self._fractions[precision]
+        self.datefmt = datefmt or "%Y-%m-%dT%H:%M:%S"
+        self._cached = (None, None)
+
+    def __call__(self, created):
+        second = int(created)
+        cached_second, template = self._cached
+        if second != cached_second:
+            prefix = time.strftime(self.datefmt, time.gmtime(second))
+            template = prefix.replace("%", "%%") + self._suffix
+            self._cached = (second, template)
+        if self._divisor is None:
+            return template
+        # Round to whole microseconds first, so float error can't turn .001 into
+        # .000, then truncate to the requested precision.
+        micros = round((created - second) * 1000000)
+        if micros > 999999:
+            micros = 999999
+        return template % (micros // self._divisor)
+
+
 class JsonFormatter(logging.Formatter):
     """AWS Lambda Logging formatter."""
 
@@ -14,40 +60,214 @@ class JsonFormatter(logging.Formatter):
         """Return a JsonFormatter instance.
 
         The `json_default` kwarg is used to specify a formatter for otherwise
-        unserialisable values.  It must not throw.  Defaults to a function that
-        coerces the value to a string.
+        unserialisable values.  It must not throw.  Defaults to
+        `cazoo_logger.serialisers.json_default`, which writes common types such as
+        datetimes and Decimals sensibly and coerces anything else to a string.
+
+        The `encoder` kwarg selects the JSON backend: "json" (the default) for
+        the standard library, "auto" for the fastest installed backend, a backend
+        name such as "orjson", or an encoder instance from `cazoo_logger.encoders`.
+
+        The `timestamp` kwarg adds a UTC "timestamp" field to each line, with "s",
+        "ms" or "us" precision.  It is off by default, since Cloudwatch already
+        timestamps every line.  `datefmt` changes how the whole seconds of the
+        timestamp are written.
+
+        The `schema` kwarg takes a `cazoo_logger.schema.Schema` declaring the
+        fields of the output, their order and names.  The formatter compiles a
+        format function specialised for it, which is faster than the generic
+        layout.
+
+        The `truncate` kwarg takes a byte budget for each line, or a
+        `cazoo_logger.truncation.Truncator`.  Data that would take the line over
+        the budget is cut down, and long messages are cut, see
+        `cazoo_logger.truncation`.
         """
         datefmt = kwargs.pop("datefmt", None)
 
         super(JsonFormatter, self).__init__(datefmt=datefmt)
-        self.default_json_formatter = kwargs.pop("json_default", json_formatter)
+        self.default_json_formatter = kwargs.pop("json_default", json_default)
+
+        encoder = kwargs.pop("encoder", "json")
+        if isinstance(encoder, str):
+            encoder = get_encoder(encoder, self.default_json_formatter)
+        self.encoder = encoder
+        self._context_prefix = '{"context"' + encoder.key_separator
+        self._context_prefix_bytes = self._context_prefix.encode("utf-8")
+        self._item_separator_bytes = encoder.item_separator.encode("utf-8")
 
-        self._supported = {"level", "context", "data", "type"}
+        timestamp = kwargs.pop("timestamp", None)
+        self._timestamp = timestamp and TimestampFormatter(timestamp, datefmt)
+
+        truncate = kwargs.pop("truncate", None)
+        if truncate is not None and not isinstance(truncate, Truncator):
+            truncate = Truncator(
+                max_bytes=truncate,
+                ensure_ascii=not encoder.compact,
+                default=self.default_json_formatter,
+            )
+        self._truncator = truncate
+
+        self.schema = kwargs.pop("schema", None)
+        if self.schema is not None:
+            self.format = compile_schema(self.schema, self)
+            self.format_bytes = compile_schema(self.schema, self, binary=True)
 
     def format(self, record):
-        record_dict = record.__dict__.copy()
-        record_dict["asctime"] = self.formatTime(record, self.datefmt)
+        return self._encode(*self._extract(record))
 
-        log_dict = {k: v for k, v in record_dict.items() if k in self._supported and v}
-        log_dict["msg"] = record.getMessage()
-        log_dict["level"] = record.levelname.lower()
+    def format_bytes(self, record):
+        """Format the record as UTF-8 encoded JSON, for binary handlers."""
+        return self._encode_bytes(*self._extract(record))
+
+    def format_batch(self, records, binary=False, on_error=None):
+        """
+        Format many records as one newline-delimited buffer, ready for a single
+        write.  Returns bytes when `binary` is set, otherwise str.
+
+        Records whose context has no cached encoding, e.g. from a hand-built
+        adapter, share one encoding per context within the batch.
+
+        :param on_error: Called with each record that can't be formatted, which is
+                         left out of the buffer.  Without it the error is raised.
+        """
+        terminator = b"\n" if binary else "\n"
+        if not records:
+            return terminator[:0]
+        try:
+            lines = self._format_lines(records, binary)
+        except Exception:
+            if on_error is None:
+                raise
+            # Format the records one at a time, so only the bad ones are lost.
+            format_one = self.format_bytes if binary else self.format
+            lines = []
+            for record in records:
+                try:
+                    lines.append(format_one(record))
+                except Exception:
+                    on_error(record)
+            if not lines:
+                return terminator[:0]
+        lines.append(terminator[:0])
+        return terminator.join(lines)
 
+    def _format_lines(self, records, binary):
+        if self.schema is not None:
+            format_one = self.format_bytes if binary else self.format
+            return [format_one(record) for record in records]
+        encode = self._encode_bytes if binary else self._encode
+        extract = self._extract
+        fragments = {}
+        lines = []
+        for record in records:
+            fragment, log_dict = extract(record)
+            context = log_dict.get("context")
+            if context is not None:
+                fragment = fragments.get(id(context))
+                if fragment is None or fragment.context is not context:
+                    fragment = fragments[id(context)] = ContextFragment(context)
+                del log_dict["context"]
+            lines.append(encode(fragment, log_dict))
+        return lines
+
+    def _encode(self, fragment, log_dict):
+        if fragment is None:
+            return self.encoder.dumps(log_dict)
+        # Splice in the cached encoding of the context rather than encoding it
+        # again.
+        return "".join(
+            (
+                self._context_prefix,
+                fragment.encode(self.encoder),
+                self.encoder.item_separator,
+                self.encoder.dumps(log_dict)[1:],
+            )
+        )
+
+    def _encode_bytes(self, fragment, log_dict):
+        if fragment is None:
+            return self.encoder.dumpb(log_dict)
+        return b"".join(
+            (
+                self._context_prefix_bytes,
+                fragment.encode_bytes(self.encoder),
+                self._item_separator_bytes,
+                self.encoder.dumpb(log_dict)[1:],
+            )
+        )
+
+    def _extract(self, record):
+        # Read the few attributes we emit straight off the record, rather than
+        # copying and filtering the whole of record.__dict__. Falsy values are
+        # left out of the line.
+        log_dict = {}
+
+        context = getattr(record, "context", None)
+        fragment = None
+        if context:
+            fragment = getattr(record, "_context_fragment", None)
+            if fragment is None or fragment.context is not context:
+                fragment = None
+                log_dict["context"] = context
+
+        msg = record.getMessage()
+        data = getattr(record, "data", None)
         if record.exc_info:
-            exc_type, exc, exc_info = record.exc_info
-            err = {
-                "name": exc_type.__name__,
-                "message": str(exc),
-                "stack": self.formatException(record.exc_info),
-            }
+            # Copy, so the error doesn't leak into a logger's shared data.
+            data = dict(data or {}, error=self.format_error(record.exc_info))
+        type_ = getattr(record, "type", None)
+        level = record.levelname.lower()
+        timestamp = self._timestamp(record.created) if self._timestamp else None
+        repeat = getattr(record, "repeat", None)
+        if self._truncator is not None:
+            msg, type_, data = self._truncate(
+                log_dict, fragment, msg, type_, data, (level, timestamp, repeat)
+            )
+        if data:
+            log_dict["data"] = data
+
+        if type_:
+            log_dict["type"] = type_
 
-            if "data" not in log_dict:
-                log_dict["data"] = {"error": err}
-            else:
-                log_dict["data"]["error"] = err
+        log_dict["msg"] = msg
+        log_dict["level"] = level
+        if timestamp:
+            log_dict["timestamp"] = timestamp
+        if repeat:
+            log_dict["repeat"] = repeat
 
-        json_record = json.dumps(log_dict, default=self.default_json_formatter)
+        return fragment, log_dict
 
-        if hasattr(json_record, "decode"):  # pragma: no cover
-            json_record = json_record.decode("utf-8")
+    def _truncate(self, log_dict, fragment, msg, type_, data, fixed):
+        # Charge what can't be cut first: the braces and keys, the cached context
+        # and the level, timestamp and repeat count. The message, type, context
+        # and data are then fitted into what is left, in that order.
+        truncator = self._truncator
+        encoder = self.encoder
+        budget = truncator.max_bytes - _KEYS_SIZE
+        if fragment is not None:
+            budget -= len(fragment.encode_bytes(encoder))
+        for value in fixed:
+            if value:
+                budget -= len(encoder.dumpb(value))
+        context = log_dict.get("context")
+        later = bool(type_) + bool(context) + bool(data)
+        msg, budget = truncator.fit(msg, budget, later)
+        if type_:
+            later -= 1
+            type_, budget = truncator.fit(type_, budget, later)
+        if context:
+            later -= 1
+            log_dict["context"], budget = truncator.fit(context, budget, later)
+        if data:
+            data, _ = truncator.fit(data, budget)
+        return msg, type_, data
 
-        return json_record
+    def format_error(self, exc_info):
+        exc_type, exc, _ = exc_info
+        return {
+            "name": exc_type.__name__,
+            "message": str(exc),
+            "stack": self.formatException(exc_info),
+        }
@@ -0,0 +1,506 @@
+"""
+HANDLERS
+This module provides the logging handlers that config() can install.
+
+BinaryStreamHandler
+Writes the UTF-8 bytes produced by JsonFormatter.format_bytes straight to a binary
+stream, by default the buffer underneath sys.stdout. That skips building a str
+and having a TextIOWrapper encode it again for every record.
+
+AsyncHandler
+Puts records on a bounded queue and formats and writes them on a background
+thread, in batches, so logging calls don't block on formatting or the write.
+Call `flush` (the lambda decorators do, via `end_invocation`) to wait until
+everything queued has been written. When the queue is full the `overflow` policy
+decides whether to block or which records to drop, and a summary of what was
+dropped is logged at the end of the invocation.
+
+CoalescingHandler
+Formats each record as it is logged but holds the lines in memory, writing them
+out together once they reach a size or age threshold, when an error is logged,
+and at the end of the invocation. That turns many small writes into a few large
+ones.
+
+FlightRecorder
+Wraps another handler. Records below its level are kept in a bounded buffer
+instead of being written, and are only written, ahead of the error, if the
+invocation logs an error. Otherwise they are thrown away when the invocation
+ends.
+
+RepeatCollapser
+Wraps another handler. Consecutive records with the same level, message, data,
+type and context are written as one line, with a "repeat" field giving the
+count and the times of the first and last.
+
+end_invocation
+Called by the lambda decorators when an invocation finishes, so handlers that
+hold records back can write them before Lambda freezes the container.
+"""
+
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import ChainMap, Counter, deque
+
+from .contexts import ContextualAdapter
+from .formatters import TimestampFormatter
+
+
+def _interpolate(record):
+    record.msg = record.getMessage()
+    record.args = None
+    return record
+
+
+def format_bytes(formatter, record):
+    """Format a record as UTF-8 bytes with any formatter."""
+    format_bytes = getattr(formatter, "format_bytes", None)
+    if format_bytes is None:
+        return formatter.format(record).encode("utf-8")
+    return format_bytes(record)
+
+
+def format_batch(formatter, records, binary=False, on_error=None):
+    """
+    Format records as one newline-delimited buffer with any formatter.
+    :param on_error: Called with each record that can't be formatted, which is
+                     left out of the buffer. Without it the error is raised.
+    """
+    format_batch = getattr(formatter, "format_batch", None)
+    if format_batch is not None:
+        return format_batch(records, binary, on_error)
+    lines = []
+    for record in records:
+        try:
+            lines.append(formatter.format(record) + "\n")
+        except Exception:
+            if on_error is None:
+                raise
+            on_error(record)
+    text = "".join(lines)
+    return text.encode("utf-8") if binary else text
+
+
+def end_invocation(log=None):
+    """
+    Give each handler and filter that `log` goes through the chance to write out
+    anything it is holding back.  They may define `end_invocation(log)`, and log
+    summaries of the invocation through `log`. Handlers without it are flushed.
+    :param log: The invocation's ContextualAdapter. Defaults to an empty logger.
+    """
+    if log is None:
+        log = ContextualAdapter(logging.root, ChainMap())
+    logger = log.logger
+    while logger:
+        for handler in list(logger.handlers):
+            _end_handler(handler, log)
+        _end_filters(logger, log)
+        logger = logger.parent if logger.propagate else None
+
+
+def _end_handler(handler, log):
+    _end_filters(handler, log)
+    end = getattr(handler, "end_invocation", None)
+    if end is None:
+        handler.flush()
+    else:
+        end(log)
+
+
+def _end_filters(filterer, log):
+    for log_filter in list(filterer.filters):
+        end = getattr(log_filter, "end_invocation", None)
+        if end is not None:
+            end(log)
+
+
+class BinaryStreamHandler(logging.StreamHandler):
+    terminator = b"\n"
+
+    def __init__(self, stream=None):
+        """
+        :param stream: A binary stream. Defaults to sys.stdout.buffer. Text already
+                       written to sys.stdout is flushed first, so lines written
+                       with print() before the handler was installed come out
+                       in order.
+        """
+        if stream is None:
+            sys.stdout.flush()
+            stream = sys.stdout.buffer
+        super().__init__(stream)
+
+    def format(self, record):
+        return format_bytes(self.formatter or logging._defaultFormatter, record)
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            self.flush()
+        except RecursionError:  # pragma: no cover
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class AsyncHandler(logging.Handler):
+    _stop = object()
+    overflow_policies = ("block", "drop_newest", "drop_oldest", "drop_below")
+
+    def __init__(
+        self,
+        stream=None,
+        binary=False,
+        capacity=10000,
+        batch_size=500,
+        overflow="block",
+        overflow_level=logging.WARNING,
+    ):
+        """
+        :param stream: The stream to write to. Defaults to stderr, or
+                       sys.stdout.buffer when `binary` is set.
+        :param binary: Write UTF-8 bytes to a binary stream.
+        :param capacity: The most records to hold before the overflow policy applies.
+        :param batch_size: The most records to format and write at once.
+        :param overflow: What to do with a record when the queue is full:
+                         "block" waits for space, "drop_newest" drops the record,
+                         "drop_oldest" drops the oldest queued record to make
+                         space, and "drop_below" drops the record if it is below
+                         `overflow_level` and otherwise waits for space.
+        :param overflow_level: The level below which "drop_below" drops records.
+        """
+        super().__init__()
+        if overflow not in self.overflow_policies:
+            raise ValueError("Invalid overflow policy {0}".format(overflow))
+        self.overflow = overflow
+        self.overflow_level = logging._checkLevel(overflow_level)
+        self.dropped = Counter()
+        if stream is None:
+            stream = sys.stdout.buffer if binary else sys.stderr
+        self.stream = stream
+        self.binary = binary
+        self.batch_size = batch_size
+        self.queue = queue.Queue(capacity)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="cazoo-logger-writer", daemon=True
+                )
+                self._thread.start()
+
+    def prepare(self, record):
+        """
+        Interpolate the message now, since its arguments may change before the
+        writer gets to the record. Values in `extra` are still encoded later, so
+        they must not be mutated after they are logged.
+        """
+        return _interpolate(record)
+
+    def enqueue(self, record):
+        # Called with the handler lock held, so producers take turns here.
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "drop_newest":
+            self.dropped[record.levelname.lower()] += 1
+        elif self.overflow == "drop_below":
+            if record.levelno < self.overflow_level:
+                self.dropped[record.levelname.lower()] += 1
+            else:
+                self.queue.put(record)
+        else:
+            while True:
+                try:
+                    oldest = self.queue.get_nowait()
+                except queue.Empty:
+                    oldest = None
+                else:
+                    self.queue.task_done()
+                    if oldest is self._stop:  # pragma: no cover
+                        self.queue.put(oldest)
+                        continue
+                    self.dropped[oldest.levelname.lower()] += 1
+                try:
+                    self.queue.put_nowait(record)
+                    return
+                except queue.Full:
+                    continue
+
+    def emit(self, record):
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def _run(self):
+        get, get_nowait = self.queue.get, self.queue.get_nowait
+        while True:
+            batch = [get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._stop in batch
+            records = [record for record in batch if record is not self._stop]
+            try:
+                self.write(records)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def write(self, records):
+        if not records:
+            return
+        formatter = self.formatter or logging._defaultFormatter
+        try:
+            data = format_batch(formatter, records, self.binary, self.handleError)
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            # Find the records that can't be written, and write the rest.
+            for record in records:
+                try:
+                    data = format_batch(formatter, [record], self.binary)
+                    self.stream.write(data)
+                    self.stream.flush()
+                except Exception:
+                    self.handleError(record)
+
+    def end_invocation(self, log):
+        """Flush, then log a summary of any records dropped this invocation."""
+        # Drain first, so there is room on the queue for the summary.
+        self.flush()
+        with self.lock:
+            dropped, self.dropped = self.dropped, Counter()
+        if dropped:
+            total = sum(dropped.values())
+            log.warning(
+                "Dropped %d log records",
+                total,
+                extra={
+                    "policy": self.overflow,
+                    "dropped": total,
+                    "levels": dict(dropped),
+                },
+                type="log-records-dropped",
+            )
+            self.flush()
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(self._stop)
+            self._thread.join()
+        super().close()
+
+
+class CoalescingHandler(logging.Handler):
+    def __init__(
+        self,
+        stream=None,
+        binary=False,
+        max_bytes=64 * 1024,
+        max_age=1.0,
+        flush_level=logging.ERROR,
+    ):
+        """
+        :param stream: The stream to write to. Defaults to stderr, or
+                       sys.stdout.buffer when `binary` is set.
+        :param binary: Write UTF-8 bytes to a binary stream.
+        :param max_bytes: Write the held lines once they add up to this size.
+        :param max_age: Write the held lines once the oldest has been held this
+                        many seconds. Checked when a record is logged, there is
+                        no timer.
+        :param flush_level: Write the held lines, and this record, as soon as a
+                            record at this level or above is logged, so nothing
+                            is lost if the process dies.
+        """
+        super().__init__()
+        if stream is None:
+            stream = sys.stdout.buffer if binary else sys.stderr
+        self.stream = stream
+        self.binary = binary
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.flush_level = logging._checkLevel(flush_level)
+        self._lines = []
+        self._size = 0
+        self._oldest = None
+        # The last record held, to report if the write fails.
+        self._last = None
+
+    def format(self, record):
+        formatter = self.formatter or logging._defaultFormatter
+        if self.binary:
+            return format_bytes(formatter, record) + b"\n"
+        return formatter.format(record) + "\n"
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if not self._lines:
+            self._oldest = time.monotonic()
+        self._lines.append(line)
+        self._size += len(line)
+        self._last = record
+        if (
+            record.levelno >= self.flush_level
+            or self._size >= self.max_bytes
+            or time.monotonic() - self._oldest >= self.max_age
+        ):
+            self._write()
+
+    def _write(self):
+        # Called with the handler lock held.
+        if not self._lines:
+            return
+        lines, self._lines, self._size = self._lines, [], 0
+        last, self._last = self._last, None
+        try:
+            self.stream.write(lines[0][:0].join(lines))
+            self.stream.flush()
+        except Exception:
+            self.handleError(last)
+
+    def flush(self):
+        with self.lock:
+            self._write()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+class _WrappingHandler(logging.Handler):
+    """Base class for handlers that pass records on to another handler."""
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def end_invocation(self, log):
+        _end_handler(self.target, log)
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        self.target.close()
+        super().close()
+
+
+class FlightRecorder(_WrappingHandler):
+    def __init__(
+        self, target, level=logging.INFO, capacity=1000, trigger_level=logging.ERROR
+    ):
+        """
+        :param target: The handler that writes records.
+        :param level: Records at this level and above are passed straight to the
+                      target. Records below it are buffered.
+        :param capacity: The most records to buffer. The oldest are dropped first.
+        :param trigger_level: Logging a record at this level or above writes out
+                              the buffer ahead of it.
+        """
+        super().__init__(target)
+        self.record_level = logging._checkLevel(level)
+        self.trigger_level = logging._checkLevel(trigger_level)
+        self.buffer = deque(maxlen=capacity)
+
+    def emit(self, record):
+        if record.levelno < self.record_level:
+            self.buffer.append(_interpolate(record))
+            return
+        if record.levelno >= self.trigger_level and self.buffer:
+            buffered = list(self.buffer)
+            self.buffer.clear()
+            for earlier in buffered:
+                self.target.handle(earlier)
+        self.target.handle(record)
+
+    def end_invocation(self, log):
+        with self.lock:
+            self.buffer.clear()
+        super().end_invocation(log)
+
+
+class RepeatCollapser(_WrappingHandler):
+    def __init__(self, target, flush_level=logging.ERROR):
+        """
+        :param target: The handler that writes records.
+        :param flush_level: Records at this level and above are never held back,
+                            so they are written even if the process dies.
+        """
+        super().__init__(target)
+        self.flush_level = logging._checkLevel(flush_level)
+        self._timestamp = TimestampFormatter("ms")
+        self._held = None
+        self._key = None
+        self._count = 0
+        self._last = None
+
+    def emit(self, record):
+        if record.levelno >= self.flush_level or record.exc_info:
+            self._release()
+            self.target.handle(record)
+            return
+        key = (
+            record.levelno,
+            record.getMessage(),
+            getattr(record, "data", None),
+            getattr(record, "type", None),
+            getattr(record, "context", None),
+        )
+        if self._held is not None and key == self._key:
+            self._count += 1
+            self._last = record.created
+            return
+        self._release()
+        self._held, self._key, self._count = _interpolate(record), key, 1
+
+    def _release(self):
+        # Called with the handler lock held.
+        held, self._held, self._key = self._held, None, None
+        if held is None:
+            return
+        if self._count > 1:
+            held.repeat = {
+                "count": self._count,
+                "first": self._timestamp(held.created),
+                "last": self._timestamp(self._last),
+            }
+        self.target.handle(held)
+
+    def end_invocation(self, log):
+        with self.lock:
+            self._release()
+        super().end_invocation(log)
+
+    def flush(self):
+        with self.lock:
+            self._release()
+        super().flush()
@@ -7,6 +7,9 @@ A wrapper class that allows the logger to be easily instantiated and pulled into
 init_logger - will create a logger instance if one does not already exist
 get_logger - will retrieve an existing logger instance
 
+The log level comes from the LOG_LEVEL environment variable. If LOG_SAMPLE_RATE is set,
+only that fraction of invocations log below WARNING, see cazoo_logger.sampling.
+
 exception_logger
 Is used as a decorator on the root Lambda Handler in a Lambda function. The function
 will create an instance of the logger and then log the incoming event data.
@@ -21,21 +24,34 @@ will create an instance of the logger and then log the incoming event data.
 
 Accepts a prelog_hook function that will be applied to all additional data logged
 e.g. this can be used to remove any PII that is accidentally logged
+
+Both decorators accept `event_fields`, a list of dotted paths, to log only those
+parts of the event. The paths are compiled once, when the handler is decorated.
+handler_logger also accepts `dedupe_events`, to log a retried or replayed event in
+full only the first time, see cazoo_logger.fingerprint.
+
+Both decorators give the log handlers a chance to write out anything they are holding
+back, e.g. in async mode, before the handler returns and Lambda freezes the container.
 """
 
 import functools
 from typing import Union
 import os
 
-from . import config, cloudwatch, empty, s3
+from . import cloudwatch, empty, s3, set_level
 from .contexts import CloudwatchContext, ContextualAdapter, S3SnsContext
+from .fingerprint import EventFingerprints, fingerprint
+from .handlers import end_invocation
+from .projection import compile_projection
+from .sampling import sample_rate_from_env, sampled_level
 
 
 class LoggerProvider:
     """
     Helper class for instantiating the Cazoo Logger.  This will be called when the new
     handler decorator is fired, and so we want to ensure that the logger is reset each
-    time.
+    time. The handler installed by `cazoo_logger.config`, e.g. at import time, and
+    its settings are kept across invocations, only the level and context are reset.
     """
 
     logger = None
@@ -45,7 +61,12 @@ class LoggerProvider:
         event, context, context_type
     ) -> Union[CloudwatchContext, S3SnsContext, ContextualAdapter]:
 
-        config(level=os.environ.get("LOG_LEVEL", "INFO"))
+        level = os.environ.get("LOG_LEVEL", "INFO")
+        rate = sample_rate_from_env()
+        if rate < 1:
+            request_id = getattr(context, "aws_request_id", None)
+            level = sampled_level(level, request_id, rate)
+        set_level(level)
         if context_type == "cloudwatch":
             LoggerProvider.logger = cloudwatch(event, context)
         elif context_type == "s3":
@@ -61,56 +82,94 @@ class LoggerProvider:
         return LoggerProvider.logger
 
 
-def exception_logger(context_type, has_pii=False):
+def _event_projection(event_fields):
+    if event_fields is None:
+        return None
+    return compile_projection(event_fields)
+
+
+def exception_logger(context_type, has_pii=False, event_fields=None):
     """
     Decorator for the Lambda handler that will instantiate the logger and log initial
     event state data.
     :param context_type: The context of the incoming cloudwatch event.
     :param has_pii: Flag to disable blanket event login for cases where events hold
                     pii data that cannot be logged to cloudwatch
+    :param event_fields: Dotted paths of the event to log, instead of all of it. See
+                         `cazoo_logger.projection`.
     """
 
     def log_decorator(handler):
+        project = _event_projection(event_fields)
+
         @functools.wraps(handler)
         def exception_handler(event, context):
             log = LoggerProvider.init_logger(event, context, context_type=context_type)
+            logged_event = event if project is None else project(event)
             if not has_pii:
-                log.info("Logging event data", extra={"event": event})
+                log.info("Logging event data", extra={"event": logged_event})
             try:
                 return handler(event, context, log)
             except Exception:
                 extra = {}
                 if not has_pii:
-                    extra["event"] = event
+                    extra["event"] = logged_event
                 log.exception("Unhandled exception in Lambda", extra=extra)
                 raise
+            finally:
+                end_invocation(log)
 
         return exception_handler
 
     return log_decorator
 
 
-def handler_logger(context_type, log_filter=None):
+def handler_logger(
+    context_type, log_filter=None, event_fields=None, dedupe_events=False
+):
     """
     Decorator for the Lambda handler that will instantiate the logger and log initial
     event state data.
     :param context_type: The context of the incoming cloudwatch event.
     :param log_filter: An optional LogFilter that will allow log data to be pre-cleaned
-                       e.g. to remove PII
+                       e.g. to remove PII. It is built once, when the handler is
+                       decorated, and attached to the logger for each invocation.
+    :param event_fields: Dotted paths of the event to log, instead of all of it. See
+                         `cazoo_logger.projection`.
+    :param dedupe_events: Log each distinct event in full only the first time this
+                          container sees it, and just its fingerprint after that.
     """
 
     def log_decorator(handler):
+        fingerprints = EventFingerprints() if dedupe_events else None
+        # The adapter attaches filters to the root logger, which outlives the
+        # invocation, so the filter is removed again at the end of each one.
+        filter_instance = log_filter() if log_filter else None
+        project = _event_projection(event_fields)
+
         @functools.wraps(handler)
         def exception_handler(event, context):
             log = LoggerProvider.init_logger(event, context, context_type=context_type)
-            if log_filter:
-                log.addFilter(log_filter())
-            log.info("Logging event data", extra={"event": event})
+            if filter_instance is not None:
+                log.addFilter(filter_instance)
+            logged_event = event if project is None else project(event)
+            extra = {"event": logged_event}
+            if fingerprints is not None:
+                digest = fingerprint(logged_event)
+                if not fingerprints.first_seen(digest):
+                    extra = {}
+                extra["event_fingerprint"] = digest
+            log.info("Logging event data", extra=extra)
             try:
                 return handler(event, context, log)
             except Exception:
-                log.exception("Unhandled exception in Lambda", extra=event)
+                # Always in full, it's needed to debug the failure.
+                log.exception("Unhandled exception in Lambda", extra=logged_event)
                 raise
+            finally:
+                end_invocation(log)
+                if filter_instance is not None:
+                    log.removeFilter(filter_instance)
 
         return exception_handler
 
@@ -0,0 +1,173 @@
+"""
+OFFLOAD
+This module moves payloads too big for a log line somewhere else, and leaves a
+pointer to them in the line.
+
+OffloadSink
+Where offloaded payloads are written. A sink stores gzipped JSON under a key
+made from its SHA-256, and says where it put it. Subclass it for object stores;
+`put` is all they need to implement.
+
+LocalDirectorySink
+Writes payloads to files in a local directory, laid out like an object store,
+e.g. "logs/ab/abcdef....json.gz". Use it for local development and tests.
+
+Offloader
+A logging filter that writes each value in a record's `data` whose JSON is over
+`threshold` bytes to a sink, and replaces it with a pointer:
+
+    {"offloaded": {"sha256": "...", "size": 1048576, "location": "..."}}
+
+A payload with a hash the Offloader has already written is not written again,
+so an event that is logged on every retry is only stored once per container.
+The last few values offloaded are also recognised by identity, as long as they
+haven't changed, so logging the same object again skips encoding and hashing it.
+If the sink fails, the value is left where it was.
+
+    cazoo_logger.config(offload=Offloader(LocalDirectorySink("/tmp/logs")))
+"""
+
+import abc
+import copy
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+
+from .serialisers import json_default
+from .truncation import Truncator
+
+# How many recently offloaded values to recognise without encoding them.
+_RECENT = 16
+
+
+class OffloadSink(abc.ABC):
+    @abc.abstractmethod
+    def put(self, key, body):
+        """
+        Store `body`, gzipped JSON, under `key`, and return where it was stored.
+        """
+
+
+class LocalDirectorySink(OffloadSink):
+    def __init__(self, directory, prefix="logs"):
+        """
+        :param directory: The directory to write to. It is created if missing.
+        :param prefix: The first part of each key, like an object store prefix.
+        """
+        self.directory = directory
+        self.prefix = prefix
+
+    def put(self, key, body):
+        path = os.path.join(self.directory, *key.split("/"))
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # Write then rename, so a reader never sees half a file.
+        fd, temp = tempfile.mkstemp(dir=folder)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(body)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        return path
+
+
+class Offloader(logging.Filter):
+    def __init__(self, sink, threshold=64 * 1024, max_seen=1024, prefix=None):
+        """
+        :param sink: The OffloadSink to write payloads to.
+        :param threshold: Values whose JSON is larger than this many bytes are
+                          offloaded.
+        :param max_seen: How many hashes of written payloads to remember.
+        :param prefix: The first part of each key. Defaults to the sink's prefix.
+        """
+        super().__init__()
+        self.sink = sink
+        self.threshold = threshold
+        self.max_seen = max_seen
+        self.prefix = prefix if prefix is not None else getattr(sink, "prefix", "")
+        self._seen = OrderedDict()
+        # The last few values offloaded, by id, with a copy to check they haven't
+        # changed since, so a value logged again isn't encoded and hashed again.
+        self._recent = OrderedDict()
+        # Sizes up values without encoding them, so most are never encoded here.
+        # It measures keys and strings as they are written below, and never
+        # counts less than that, so a value it passes is under the threshold.
+        self._estimate = Truncator(
+            max_bytes=threshold,
+            max_string=sys.maxsize,
+            max_items=sys.maxsize,
+            max_depth=sys.maxsize,
+            ensure_ascii=False,
+        )
+
+    def filter(self, record):
+        data = getattr(record, "data", None)
+        if not data or not isinstance(data, dict):
+            return True
+        copy = None
+        for key, value in data.items():
+            pointer = self.offload(value)
+            if pointer is not None:
+                if copy is None:
+                    copy = dict(data)
+                copy[key] = pointer
+        if copy is not None:
+            record.data = copy
+        return True
+
+    def offload(self, value):
+        """
+        Write `value` to the sink if its JSON is over the threshold, and return
+        the pointer to log in its place, otherwise return None.
+        """
+        if not isinstance(value, (str, dict, list, tuple)):
+            return None
+        recent = self._recent.get(id(value))
+        if recent is not None and recent[0] is value and recent[1] == value:
+            self._recent.move_to_end(id(value))
+            return self._pointer(*recent[2:])
+
+        # Only a value the estimate had to cut can be over the threshold.
+        if self._estimate.truncate(value, self.threshold) is value:
+            return None
+        body = json.dumps(
+            value, default=json_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        if len(body) <= self.threshold:
+            return None
+
+        digest = hashlib.sha256(body).hexdigest()
+        location = self._seen.get(digest)
+        if location is None:
+            key = "{0}/{1}/{2}.json.gz".format(self.prefix, digest[:2], digest)
+            try:
+                location = self.sink.put(key.lstrip("/"), gzip.compress(body))
+            except Exception:
+                return None
+            self._seen[digest] = location
+            if len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+        else:
+            self._seen.move_to_end(digest)
+        self._remember(value, digest, len(body), location)
+        return self._pointer(digest, len(body), location)
+
+    def _remember(self, value, digest, size, location):
+        try:
+            snapshot = copy.deepcopy(value)
+        except Exception:
+            return
+        self._recent[id(value)] = (value, snapshot, digest, size, location)
+        if len(self._recent) > _RECENT:
+            self._recent.popitem(last=False)
+
+    @staticmethod
+    def _pointer(digest, size, location):
+        return {"offloaded": {"sha256": digest, "size": size, "location": location}}
@@ -0,0 +1,48 @@
+"""
+PATHS
+This module parses the dotted paths used to pick values out of logged data, like
+"detail.customer.email", into a lookup of nested dicts built once.
+
+Each segment names a key, and "*" matches any key. Lists are not named in paths:
+whatever walks the lookup applies the same node to every item of a list.
+"""
+
+# Marks the end of a path in the compiled lookup.
+END = object()
+
+
+def compile_paths(paths):
+    """
+    Build a lookup of nested dicts from dotted paths, keyed by segment, with
+    `END` in the dict at the end of each path.
+    """
+    root = {}
+    for path in paths:
+        segments = path.split(".")
+        if not all(segments):
+            raise ValueError("Invalid path {0!r}".format(path))
+        node = root
+        for segment in segments:
+            node = node.setdefault(segment, {})
+        node[END] = True
+    _merge_wildcards(root)
+    return root
+
+
+def _merge(target, source):
+    for key, child in source.items():
+        if key is END:
+            target[END] = True
+        else:
+            _merge(target.setdefault(key, {}), child)
+
+
+def _merge_wildcards(node):
+    """Copy the paths under "*" to its siblings, so a key only needs one lookup."""
+    wildcard = node.get("*")
+    for key, child in node.items():
+        if wildcard is not None and key != "*" and key is not END:
+            _merge(child, wildcard)
+    for key, child in node.items():
+        if key is not END:
+            _merge_wildcards(child)
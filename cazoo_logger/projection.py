@@ -0,0 +1,74 @@
+"""
+PROJECTION
+This module picks the parts of an event worth logging, so the lambda decorators
+don't serialise a whole payload when only a few fields are ever read.
+
+compile_projection
+Turns a list of dotted paths, e.g. "detail.order.id" or "Records.Sns.MessageId",
+into a function that returns a new dict holding only those paths. The paths are
+compiled once, into one small function per node, and the function only looks up
+the keys the paths name, so the rest of the event is never visited. Lists are
+walked through, keeping the selected paths of each item, and "*" matches any key.
+Paths that aren't in the event are left out.
+
+    project = compile_projection(["source", "detail-type", "detail.order.id"])
+    project(event)  # {"source": ..., "detail-type": ..., "detail": {"order": {...}}}
+"""
+
+from .paths import END, compile_paths
+
+# Returned for a path that doesn't match, so its key is left out.
+_MISSING = object()
+
+
+def _whole(value):
+    return value
+
+
+def _compile(node):
+    if END in node:
+        return _whole
+    children = {
+        key: _compile(child)
+        for key, child in node.items()
+        if key is not END and key != "*"
+    }
+    wildcard = _compile(node["*"]) if "*" in node else None
+
+    def project(value):
+        if isinstance(value, dict):
+            out = {}
+            if wildcard is None:
+                for key, child in children.items():
+                    if key in value:
+                        item = child(value[key])
+                        if item is not _MISSING:
+                            out[key] = item
+            else:
+                for key, item in value.items():
+                    item = children.get(key, wildcard)(item)
+                    if item is not _MISSING:
+                        out[key] = item
+            return out if out else _MISSING
+        if isinstance(value, (list, tuple)):
+            items = [project(item) for item in value]
+            items = [item for item in items if item is not _MISSING]
+            return items if items else _MISSING
+        return _MISSING
+
+    return project
+
+
+def compile_projection(paths):
+    """
+    Build a function that returns the parts of a value selected by `paths`, as a
+    new dict, or an empty dict when none of them are present.
+    :param paths: Dotted paths from the root of the value.
+    """
+    project = _compile(compile_paths(paths))
+
+    def projection(value):
+        result = project(value)
+        return {} if result is _MISSING else result
+
+    return projection
@@ -0,0 +1,275 @@
+"""
+REDACTION
+This module removes personal data from log records before they are written.
+
+Redactor
+Compiles a set of field names, redacted wherever they appear, and dotted paths,
+redacted only at that position, into a lookup built once. Redacting a value walks
+it and copies only the dicts and lists on the way to something it replaces, so
+subtrees without personal data are shared with the original, and the original is
+never modified.
+
+Paths start at "data" or "context", and lists are walked through transparently,
+so "data.event.customers.email" matches the email of every customer. A "*"
+segment matches any key.
+
+A Redactor can also scrub strings that look like personal data wherever they
+appear, in values and in the message. The patterns are combined into one regular
+expression, so each string is searched once, strings too short to match are
+skipped, and the results for recent strings are cached. DEFAULT_PATTERNS finds
+emails, UK phone numbers, UK postcodes, card numbers and registration marks.
+
+Pseudonymiser
+A replacement that writes a truncated HMAC of the value instead of removing it,
+so one customer's records can still be correlated across lines without logging
+who they are. The key comes from the LOG_PII_HASH_KEY environment variable unless
+one is given, and tokens for recent values are cached.
+
+RedactionFilter
+Runs a Redactor over the `data` and `context` of each record. The redacted context
+is kept between records, so its cached encoding is reused.
+
+    redactor = Redactor(
+        fields=["email_address"], paths=["data.event.detail.name"], patterns=True
+    )
+    cazoo_logger.config(redact=redactor)
+"""
+
+import functools
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+
+from .contexts import ContextFragment
+from .paths import END, compile_paths
+
+REDACTED = "PII REMOVED"
+
+
+def _luhn(digits):
+    total = 0
+    for index, digit in enumerate(reversed(digits)):
+        digit = int(digit)
+        if index % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+def _card(text):
+    # Long numbers that fail the checksum are usually ids, not cards.
+    digits = re.sub(r"[ -]", "", text)
+    return "CARD REMOVED" if _luhn(digits) else text
+
+
+# Name: (regular expression, replacement). A replacement may be a function that
+# is given the matched text. Earlier patterns win where they overlap.
+DEFAULT_PATTERNS = {
+    "email": (r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", "EMAIL REMOVED"),
+    "card": (r"\b(?:\d[ -]?){12,18}\d\b", _card),
+    "phone": (r"(?:\+44 ?|\b0)(?:\d ?){9,10}\b", "PHONE REMOVED"),
+    "postcode": (r"\b[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}\b", "POSTCODE REMOVED"),
+    "vrm": (r"\b[A-Z]{2}\d{2} ?[A-Z]{3}\b", "VRM REMOVED"),
+}
+
+
+class Pseudonymiser:
+    def __init__(self, key=None, length=16, prefix="pii_", cache_size=4096):
+        """
+        :param key: The HMAC key, as str or bytes. Defaults to the LOG_PII_HASH_KEY
+                    environment variable.
+        :param length: How many hex characters of the HMAC to keep.
+        :param prefix: Written before each token, so they are easy to spot.
+        :param cache_size: How many recent values to remember the tokens of.
+        """
+        if key is None:
+            key = os.environ.get("LOG_PII_HASH_KEY")
+        if not key:
+            # Without a secret key, a token can be reversed by hashing guesses.
+            raise ValueError("Pseudonymiser needs a key, set LOG_PII_HASH_KEY")
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        self._key = key
+        self.length = length
+        self.prefix = prefix
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._token)
+
+    def _token(self, text):
+        digest = hmac.new(self._key, text.encode("utf-8"), hashlib.sha256)
+        return self.prefix + digest.hexdigest()[: self.length]
+
+    def __call__(self, value):
+        """Return the token for `value`. Equal values always get equal tokens."""
+        if isinstance(value, str):
+            return self._cached(value)
+        if isinstance(value, (dict, list, tuple)):
+            try:
+                text = json.dumps(value, sort_keys=True, default=str)
+            except TypeError:
+                # Keys of mixed types can't be sorted.
+                text = json.dumps(value, default=str)
+            return self._token(text)
+        return self._cached(str(value))
+
+
+class Redactor:
+    def __init__(
+        self,
+        fields=(),
+        paths=(),
+        replacement=REDACTED,
+        patterns=None,
+        min_length=5,
+        cache_size=1024,
+    ):
+        """
+        :param fields: Keys whose values are redacted at any depth.
+        :param paths: Dotted paths from "data" or "context" to redact.
+        :param replacement: The value written in place of redacted values, or a
+                            function, like a Pseudonymiser, called with the value.
+        :param patterns: True for DEFAULT_PATTERNS, or a dict of name to a regular
+                         expression and its replacement, to scrub from strings.
+        :param min_length: Strings shorter than this are not searched. It must not
+                           be longer than the shortest possible match.
+        :param cache_size: How many recently scrubbed strings to remember.
+        """
+        self.fields = frozenset(fields)
+        self.paths = compile_paths(paths)
+        self.replacement = replacement
+        # Returns a string with the patterns replaced, or the same string when
+        # none matched, so its container isn't copied.
+        self.scrub = None
+        if patterns:
+            if patterns is True:
+                patterns = DEFAULT_PATTERNS
+            self._replacements = {}
+            alternatives = []
+            for index, (pattern, replace) in enumerate(patterns.values()):
+                name = "_{0}".format(index)
+                self._replacements[name] = replace
+                alternatives.append("(?P<{0}>{1})".format(name, pattern))
+            self._pattern = re.compile("|".join(alternatives))
+            self.min_length = min_length
+            self._scrub_cached = functools.lru_cache(maxsize=cache_size)(self._scrub)
+            self.scrub = self._scrub_string
+
+    def _replace(self, match):
+        replace = self._replacements[match.lastgroup]
+        if callable(replace):
+            return replace(match.group())
+        return replace
+
+    def _scrub(self, text):
+        scrubbed = self._pattern.sub(self._replace, text)
+        return None if scrubbed == text else scrubbed
+
+    def _scrub_string(self, text):
+        if len(text) < self.min_length:
+            return text
+        scrubbed = self._scrub_cached(text)
+        return text if scrubbed is None else scrubbed
+
+    def redact(self, value, path=None):
+        """
+        Return `value` with personal data replaced, or `value` itself when
+        nothing in it was redacted.
+        :param path: The root of the paths to follow, e.g. "data".
+        """
+        node = self.paths.get(path) if path else None
+        return self._walk(value, node)
+
+    def _walk(self, value, node):
+        if not self.fields and node is None and self.scrub is None:
+            return value
+        if isinstance(value, dict):
+            return self._walk_dict(value, node)
+        if isinstance(value, (list, tuple)):
+            return self._walk_list(value, node)
+        if isinstance(value, str) and self.scrub is not None:
+            return self.scrub(value)
+        return value
+
+    def _walk_dict(self, value, node):
+        fields = self.fields
+        scrub = self.scrub
+        copy = None
+        for key, item in value.items():
+            child = None
+            if node is not None:
+                child = node.get(key)
+                if child is None:
+                    child = node.get("*")
+            if key in fields or (child is not None and END in child):
+                new = self.replacement
+                if callable(new):
+                    new = new(item)
+            elif isinstance(item, (dict, list, tuple)):
+                new = self._walk(item, child)
+            elif scrub is not None and isinstance(item, str):
+                new = scrub(item)
+            else:
+                continue
+            if new is not item:
+                if copy is None:
+                    copy = dict(value)
+                copy[key] = new
+        return value if copy is None else copy
+
+    def _walk_list(self, value, node):
+        copy = None
+        scrub = self.scrub
+        for index, item in enumerate(value):
+            if isinstance(item, (dict, list, tuple)):
+                new = self._walk(item, node)
+            elif scrub is not None and isinstance(item, str):
+                new = scrub(item)
+            else:
+                continue
+            if new is not item:
+                if copy is None:
+                    copy = list(value)
+                copy[index] = new
+        return value if copy is None else copy
+
+
+class RedactionFilter(logging.Filter):
+    def __init__(self, redactor):
+        """
+        :param redactor: The Redactor to run over each record.
+        """
+        super().__init__()
+        self.redactor = redactor
+        # The last context seen, its redacted copy and that copy's fragment.
+        self._cached_context = (None, None, None)
+
+    def filter(self, record):
+        scrub = self.redactor.scrub
+        if scrub is not None:
+            msg = record.getMessage()
+            scrubbed = scrub(msg)
+            if scrubbed is not msg:
+                record.msg, record.args = scrubbed, None
+
+        data = getattr(record, "data", None)
+        if data:
+            record.data = self.redactor.redact(data, "data")
+
+        context = getattr(record, "context", None)
+        if context:
+            # Filters run before the handler takes its lock, so the cache is read
+            # and replaced whole, never one part at a time.
+            cached = self._cached_context
+            if cached[0] is not context:
+                redacted = self.redactor.redact(context, "context")
+                cached = (context, redacted, ContextFragment(redacted))
+                self._cached_context = cached
+            _, redacted, fragment = cached
+            if redacted is not context:
+                record.context = redacted
+                record._context_fragment = fragment
+        return True
@@ -0,0 +1,74 @@
+"""
+SAMPLING
+This module decides which invocations keep their low-level logs.
+
+A fixed fraction of invocations, chosen by a hash of the request id, log at the
+configured level. The rest only log warnings and errors. Because the decision
+depends only on the request id, every line of an invocation is kept or dropped
+together, and a retried request is sampled the same way each time.
+
+The LoggerProvider reads the fraction from the LOG_SAMPLE_RATE environment
+variable, e.g. LOG_SAMPLE_RATE=0.1 keeps debug and info logs for one invocation
+in ten. Sampled-out invocations raise the root logger's level, so their
+debug and info calls return before a record is created.
+"""
+
+import logging
+import os
+import warnings
+import zlib
+
+# The last LOG_SAMPLE_RATE read and the rate parsed from it, or None if it isn't
+# valid, so a warm invocation doesn't parse it again.
+_parsed = (None, None)
+
+
+def _parse_rate(raw):
+    try:
+        rate = float(raw)
+    except ValueError:
+        rate = None
+    if rate is None or not 0 <= rate <= 1:
+        warnings.warn(
+            "LOG_SAMPLE_RATE must be a number between 0 and 1, not {0!r}, the "
+            "default is used instead".format(raw),
+            RuntimeWarning,
+        )
+        return None
+    return rate
+
+
+def sample_rate_from_env(default=1.0):
+    """
+    Return the rate set by LOG_SAMPLE_RATE, or `default` if it is unset or isn't a
+    number between 0 and 1. An invalid value is warned about once.
+    """
+    global _parsed
+    raw = os.environ.get("LOG_SAMPLE_RATE")
+    if not raw:
+        return default
+    cached_raw, rate = _parsed
+    if raw != cached_raw:
+        rate = _parse_rate(raw)
+        _parsed = (raw, rate)
+    return default if rate is None else rate
+
+
+def is_sampled(request_id, rate):
+    """Return True if the invocation with this request id keeps its logs."""
+    if rate >= 1:
+        return True
+    if rate <= 0:
+        return False
+    return zlib.crc32(str(request_id).encode("utf-8")) < rate * 2 ** 32
+
+
+def sampled_level(level, request_id, rate, suppressed_level=logging.WARNING):
+    """
+    Return the level to log at for this invocation: `level` if it is sampled,
+    otherwise `suppressed_level`, unless `level` is already higher.
+    """
+    level = logging._checkLevel(level)
+    if is_sampled(request_id, rate):
+        return level
+    return max(level, logging._checkLevel(suppressed_level))
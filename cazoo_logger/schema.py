@@ -0,0 +1,209 @@
+"""
+SCHEMA
+This module lets a JsonFormatter be given a fixed output layout.
+
+Field
+Declares one key of the output: its name, the record attribute it is read from,
+and whether it is left out when falsy.
+
+Schema
+An ordered collection of Fields. `compile_schema` turns a Schema into a format
+function specialised for that layout, so each record is written without looping
+over fields or building an intermediate dict.
+
+A few sources are special: "msg" is the interpolated message, "level" the
+lower-cased level name, "timestamp" the formatter's timestamp, "context" uses the
+adapter's cached context encoding and "data" carries exception details.
+"""
+
+from .contexts import ContextFragment
+
+
+class Field:
+    def __init__(self, name, source=None, optional=True):
+        """
+        :param name: The key written to the log line.
+        :param source: The record attribute to read. Defaults to `name`.
+        :param optional: Leave the key out when the value is falsy. Required keys
+                         are always written, as null when the attribute is missing.
+        """
+        self.name = name
+        self.source = source or name
+        self.optional = optional
+        if not self.source.isidentifier():
+            raise ValueError("Invalid field source {0}".format(self.source))
+
+    def __repr__(self):
+        return "Field({0!r}, source={1!r}, optional={2!r})".format(
+            self.name, self.source, self.optional
+        )
+
+
+class Schema:
+    def __init__(self, *fields):
+        names = [field.name for field in fields]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate field names in schema {0}".format(names))
+        self.fields = fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+
+DEFAULT_SCHEMA = Schema(
+    Field("context"),
+    Field("data"),
+    Field("type"),
+    Field("msg", optional=False),
+    Field("level", optional=False),
+    Field("timestamp"),
+    Field("repeat"),
+)
+
+
+def _value_source(field):
+    """Lines of generated code that leave the field's value in `value`."""
+    source = field.source
+    if source == "msg":
+        return ["value = record.getMessage()"]
+    if source == "level":
+        return [
+            "value = levels.get(record.levelname)",
+            "if value is None:",
+            "    value = levels.setdefault(record.levelname, record.levelname.lower())",
+        ]
+    if source == "timestamp":
+        return ["value = timestamp(record.created) if timestamp else None"]
+    lines = ["value = getattr(record, {0!r}, None)".format(source)]
+    if source == "data":
+        lines += [
+            "if record.exc_info:",
+            "    value = dict(value or {}, error=format_error(record.exc_info))",
+        ]
+    return lines
+
+
+def _truncate_source(fields, splice_context, reserve):
+    """
+    Lines of generated code that fit the values, read into `value0`, `value1`
+    and so on, into one budget. What isn't cut, the keys, the level, the
+    timestamp, the repeat count and the cached context, is charged first. The
+    message is fitted next, then the other fields in the schema's order.
+    """
+    lines = ["budget = truncator.max_bytes - {0}".format(reserve)]
+    fitted = []
+    for index, field in enumerate(fields):
+        name = "value{0}".format(index)
+        if field.source in ("level", "timestamp", "repeat"):
+            lines += ["if {0}:".format(name)]
+            lines += ["    budget -= len(encoder.dumpb({0}))".format(name)]
+        elif splice_context and index == 0:
+            lines += [
+                "fragment = getattr(record, '_context_fragment', None)",
+                "if fragment is not None and fragment.context is {0}:".format(name),
+                "    budget -= len(fragment.encode_bytes(encoder))",
+                "else:",
+                "    fragment = None",
+            ]
+            fitted.append((field, "fragment is None and " + name, name))
+        else:
+            fitted.append((field, name, name))
+    fitted.sort(key=lambda item: item[0].source != "msg")
+    for index, (field, condition, name) in enumerate(fitted):
+        later = len(fitted) - index - 1
+        lines += [
+            "if {0}:".format(condition),
+            "    {0}, budget = truncator.fit({0}, budget, {1})".format(name, later),
+        ]
+    return lines
+
+
+def _store_value(field, splice_context):
+    """
+    Lines of generated code that put `value` into the output dict. With
+    `splice_context`, the value is the context of the first field, which is left
+    out when its cached encoding can be spliced in.
+    """
+    if splice_context:
+        return [
+            "fragment = getattr(record, '_context_fragment', None)",
+            "if fragment is None or fragment.context is not value:",
+            "    fragment = None",
+            "    out[{0!r}] = value".format(field.name),
+        ]
+    return ["out[{0!r}] = value".format(field.name)]
+
+
+def compile_schema(schema, formatter, binary=False):
+    """
+    Build a function that formats a record according to `schema`, returning str,
+    or UTF-8 encoded bytes when `binary` is set.
+
+    The function is generated as Python source with the keys, their order and
+    their optionality baked in, then compiled once.  When "context" is the first
+    field, the adapter's cached context encoding is spliced in front of the rest
+    of the line.
+    """
+    encoder = formatter.encoder
+    fields = list(schema)
+    splice_context = bool(fields) and fields[0].source == "context"
+    prefix = "{"
+    if splice_context:
+        prefix += encoder.dumps(fields[0].name) + encoder.key_separator
+    separator, close = encoder.item_separator, "}"
+    if binary:
+        prefix, separator, close = (
+            text.encode("utf-8") for text in (prefix, separator, close)
+        )
+    namespace = {
+        "dumps": encoder.dumpb if binary else encoder.dumps,
+        "encoder": encoder,
+        "encode_fragment": ContextFragment.encode_bytes
+        if binary
+        else ContextFragment.encode,
+        "format_error": formatter.format_error,
+        "timestamp": formatter._timestamp,
+        "truncator": formatter._truncator,
+        "levels": {},
+        "PREFIX": prefix,
+        "SEPARATOR": separator,
+        "CLOSE": close,
+    }
+
+    body = ["out = {}", "fragment = None"]
+    if formatter._truncator is not None:
+        # Read every value first, so they can share one budget.
+        for index, field in enumerate(fields):
+            body += _value_source(field)
+            body += ["value{0} = value".format(index)]
+        # The braces, and each key with its quotes and separators.
+        reserve = 2 + sum(len(encoder.dumpb(field.name)) + 4 for field in fields)
+        body += _truncate_source(fields, splice_context, reserve)
+    for index, field in enumerate(fields):
+        if formatter._truncator is not None:
+            body += ["value = value{0}".format(index)]
+        else:
+            body += _value_source(field)
+        # Only the first field is spliced, any others are written as usual.
+        store = _store_value(field, splice_context and index == 0)
+        if field.optional:
+            body += ["if value:"] + ["    " + line for line in store]
+        else:
+            body += store
+    if splice_context:
+        body += [
+            "if fragment is not None:",
+            "    context = encode_fragment(fragment, encoder)",
+            "    if out:",
+            "        return PREFIX + context + SEPARATOR + dumps(out)[1:]",
+            "    return PREFIX + context + CLOSE",
+        ]
+    body.append("return dumps(out)")
+
+    source = "def format_record(record):\n" + "".join(
+        "    {0}\n".format(line) for line in body
+    )
+    exec(compile(source, "<schema {0!r}>".format(schema.fields), "exec"), namespace)
+    format_record = namespace["format_record"]
+    format_record.source = source
+    return format_record
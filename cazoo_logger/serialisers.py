@@ -0,0 +1,97 @@
+"""
+SERIALISERS
+This module decides how the JsonFormatter writes values that JSON has no type for.
+
+TypeRegistry
+Maps a type to a function that turns its instances into something JSON can
+encode. Lookups follow the method resolution order, like functools.singledispatch,
+and are cached per type, so subclasses find their parent's serialiser.
+
+json_default
+The registry the JsonFormatter uses unless it is given another `json_default`.
+It knows how to write datetimes, Decimals, UUIDs, Enums, sets, bytes and
+dataclasses, and writes anything else with str().
+
+register
+Adds a type to json_default, either called directly or as a decorator:
+
+    @register(Money)
+    def money(value):
+        return {"amount": str(value.amount), "currency": value.currency}
+"""
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import functools
+import uuid
+
+
+def _fallback(obj):
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow, the encoder calls back in for any nested values.
+        fields = dataclasses.fields(obj)
+        return {field.name: getattr(obj, field.name) for field in fields}
+    return str(obj)
+
+
+class TypeRegistry:
+    def __init__(self):
+        self._dispatch = functools.singledispatch(_fallback)
+        # A plain dict in front of singledispatch's own cache, which is a
+        # WeakKeyDictionary that also checks ABC registrations on every call.
+        self._cache = {}
+
+    def register(self, cls, func=None):
+        """
+        Register `func` as the serialiser for `cls` and its subclasses. The
+        function must not throw.
+        """
+        self._cache.clear()
+        return self._dispatch.register(cls, func)
+
+    def copy(self):
+        """Return a new registry with the same serialisers."""
+        registry = TypeRegistry()
+        for cls, func in self._dispatch.registry.items():
+            if cls is not object:
+                registry.register(cls, func)
+        return registry
+
+    def __call__(self, obj):
+        cls = obj.__class__
+        try:
+            func = self._cache[cls]
+        except KeyError:
+            func = self._cache[cls] = self._dispatch.dispatch(cls)
+        return func(obj)
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _sequence(value):
+    try:
+        return sorted(value)
+    except TypeError:
+        return list(value)
+
+
+def _bytes(value):
+    return bytes(value).decode("utf-8", "backslashreplace")
+
+
+json_default = TypeRegistry()
+json_default.register(datetime.date, _isoformat)
+json_default.register(datetime.time, _isoformat)
+json_default.register(decimal.Decimal, str)
+json_default.register(uuid.UUID, str)
+json_default.register(enum.Enum, lambda value: value.value)
+json_default.register(set, _sequence)
+json_default.register(frozenset, _sequence)
+json_default.register(bytes, _bytes)
+json_default.register(bytearray, _bytes)
+
+register = json_default.register
@@ -0,0 +1,258 @@
+"""
+TRUNCATION
+This module keeps log lines within a size budget. Cloudwatch splits lines over
+256 KB, and very large payloads slow down everything that reads the logs.
+
+Truncator
+Walks a value the way the encoder will, adding up the encoded size of what it has
+seen, and returns a copy cut down to fit:
+
+- strings longer than `max_string` are cut, with a marker saying how much is gone
+- lists longer than `max_items` keep their first `keep_items` items, followed by a
+  marker with the number left out
+- dicts and lists nested deeper than `max_depth` are replaced with a summary
+- once the budget is spent, the rest of each dict and list is replaced with a
+  marker
+
+Values are only measured up to the point where the budget runs out, so an
+oversized payload is never encoded in full just to find out that it's too big.
+Containers that fit are shared with the original rather than copied.
+
+Strings and keys are measured as the encoder writes them: escaped, and with every
+non-ASCII character written as \\uXXXX when `ensure_ascii` is set, otherwise as
+UTF-8. Separators are counted at their widest, so the result may come out a
+little under the budget, never over it, as long as the budget has room for a
+truncation marker.
+"""
+
+import math
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+from .serialisers import json_default
+
+# Room kept for each truncation marker, e.g. "[123 more keys truncated]" with its
+# key and separators. Every enclosing container keeps room for its own marker, so
+# adding the markers can't take a value over its budget.
+_MARKER_SIZE = 64
+
+# A separator between items, ", " or ": " at its widest.
+_SEPARATOR_SIZE = 2
+
+_NUMBERS = frozenset((int, float))
+
+
+class Truncator:
+    def __init__(
+        self,
+        max_bytes=200 * 1024,
+        max_string=16 * 1024,
+        max_items=100,
+        keep_items=10,
+        max_depth=10,
+        ensure_ascii=True,
+        default=json_default,
+    ):
+        """
+        :param max_bytes: The budget for a whole line.
+        :param max_string: The longest string to keep whole, in characters.
+        :param max_items: The longest list to keep whole.
+        :param keep_items: How many items of a longer list to keep.
+        :param max_depth: How deeply dicts and lists may be nested.
+        :param ensure_ascii: Whether the encoder escapes non-ASCII characters, as
+                             the default stdlib encoder does. When in doubt leave
+                             it set, which can only overestimate.
+        :param default: The encoder's serialiser for values JSON has no type for.
+        """
+        self.max_bytes = max_bytes
+        self.max_string = max_string
+        self.max_items = max_items
+        self.keep_items = keep_items
+        self.max_depth = max_depth
+        self.ensure_ascii = ensure_ascii
+        self.default = default
+
+    def truncate(self, value, budget=None):
+        """
+        Return `value` cut down to at most `budget` bytes of JSON, or `value`
+        itself when it fits.
+        :param budget: Defaults to `max_bytes`.
+        """
+        if budget is None:
+            budget = self.max_bytes
+        return self._walk(value, 0, budget)[0]
+
+    def fit(self, value, budget, later=0):
+        """
+        Return `value` cut down to at most `budget` bytes of JSON, and how much of
+        the budget is left.
+        :param later: How many values will be fitted into what is left. Room is
+                      kept for each of their truncation markers.
+        """
+        keep = later * _MARKER_SIZE
+        value, remaining = self._walk(value, 0, budget - keep)
+        return value, remaining + keep
+
+    def truncate_string(self, value):
+        """Return `value` cut to `max_string` characters, with a marker."""
+        if len(value) <= self.max_string:
+            return value
+        return self._cut(value, self.max_string)
+
+    def string_size(self, value):
+        """The size in bytes of `value` encoded as a JSON string, with quotes."""
+        if self.ensure_ascii or value.isascii():
+            return len(encode_basestring_ascii(value))
+        return len(encode_basestring(value).encode("utf-8"))
+
+    @staticmethod
+    def _cut(value, length):
+        return "{0}...[{1} chars truncated]".format(value[:length], len(value) - length)
+
+    def _walk(self, value, depth, remaining):
+        """
+        Return the value cut to fit, and what is left of the budget. `depth` is
+        the number of containers around the value, which each keep room for a
+        marker.
+        """
+        cls = value.__class__
+        if cls is str:
+            return self._fit_string(value, depth, remaining)
+        if cls in _NUMBERS:
+            return self._fit_number(value, depth, remaining)
+        if value is None or cls is bool:
+            return value, remaining - 5
+        if isinstance(value, dict):
+            if depth >= self.max_depth:
+                return self._summary("dict", len(value), "keys", remaining)
+            return self._walk_dict(value, depth + 1, remaining)
+        if isinstance(value, (list, tuple)):
+            if depth >= self.max_depth:
+                return self._summary("list", len(value), "items", remaining)
+            return self._walk_list(value, depth + 1, remaining)
+        if isinstance(value, str):
+            return self._fit_string(str(value), depth, remaining)
+        if isinstance(value, (int, float)):
+            return self._fit_number(value, depth, remaining)
+        # Measure what the encoder will write in its place.
+        converted = self.default(value) if self.default else str(value)
+        new, remaining = self._walk(converted, depth, remaining)
+        return (value if new is converted else new), remaining
+
+    def _fit_string(self, value, depth, remaining):
+        length = len(value)
+        fitted = value
+        if length > self.max_string:
+            length = self.max_string
+            fitted = self._cut(value, length)
+        available = remaining - depth * _MARKER_SIZE
+        # Every character takes at least a byte, so only measure strings that
+        # might fit.
+        if len(fitted) + 2 <= available:
+            size = self.string_size(fitted)
+            if size <= available:
+                return fitted, remaining - size
+        length = min(length, available)
+        while True:
+            cut = self._cut(value, max(length, 0))
+            size = self.string_size(cut)
+            if size <= available or length <= 0:
+                return cut, remaining - size
+            length = min(length - 1, length * available // size)
+
+    def _fit_number(self, value, depth, remaining):
+        if value.__class__ is float and not math.isfinite(value):
+            size = 9
+        else:
+            size = len(repr(value))
+        if size > remaining - depth * _MARKER_SIZE:
+            value = "[number truncated]"
+            size = len(value) + 2
+        return value, remaining - size
+
+    @staticmethod
+    def _summary(kind, length, unit, remaining):
+        summary = "[{0} with {1} {2} truncated]".format(kind, length, unit)
+        return summary, remaining - len(summary) - 2
+
+    def _key_size(self, key):
+        if key.__class__ is not str:
+            key = str(key)
+        return self.string_size(key) + _SEPARATOR_SIZE * 2
+
+    def _walk_dict(self, value, depth, remaining):
+        copy = None
+        remaining -= 2
+        # Room for this dict's marker and those of the containers around it.
+        reserve = depth * _MARKER_SIZE
+        ensure_ascii = self.ensure_ascii
+        max_string = self.max_string
+        for index, (key, item) in enumerate(value.items()):
+            if key.__class__ is str and (ensure_ascii or key.isascii()):
+                key_size = len(encode_basestring_ascii(key)) + _SEPARATOR_SIZE * 2
+            else:
+                key_size = self._key_size(key)
+            if remaining - key_size <= reserve + _MARKER_SIZE:
+                if copy is None:
+                    copy = dict(value)
+                for key in list(copy)[index:]:
+                    del copy[key]
+                marker = "[{0} more keys truncated]".format(len(value) - index)
+                copy["..."] = marker
+                return copy, remaining - len(marker) - 11
+            remaining -= key_size
+            # Short strings and numbers are the most common values, measure them
+            # here.
+            cls = item.__class__
+            if cls is str and len(item) <= max_string:
+                if ensure_ascii or item.isascii():
+                    size = len(encode_basestring_ascii(item))
+                else:
+                    size = self.string_size(item)
+                if size <= remaining - reserve:
+                    remaining -= size
+                    continue
+            elif cls is int and len(repr(item)) <= remaining - reserve:
+                remaining -= len(repr(item))
+                continue
+            new, remaining = self._walk(item, depth, remaining)
+            if new is not item:
+                if copy is None:
+                    copy = dict(value)
+                copy[key] = new
+        return (value if copy is None else copy), remaining
+
+    def _walk_list(self, value, depth, remaining):
+        copy = None
+        length = len(value)
+        keep = length if length <= self.max_items else self.keep_items
+        remaining -= 2
+        reserve = depth * _MARKER_SIZE
+        ensure_ascii = self.ensure_ascii
+        max_string = self.max_string
+        for index in range(keep):
+            if remaining - _SEPARATOR_SIZE <= reserve + _MARKER_SIZE:
+                keep = index
+                break
+            remaining -= _SEPARATOR_SIZE
+            item = value[index]
+            if item.__class__ is str and len(item) <= max_string:
+                if ensure_ascii or item.isascii():
+                    size = len(encode_basestring_ascii(item))
+                else:
+                    size = self.string_size(item)
+                if size <= remaining - reserve:
+                    remaining -= size
+                    continue
+            new, remaining = self._walk(item, depth, remaining)
+            if new is not item:
+                if copy is None:
+                    copy = list(value[:keep])
+                copy[index] = new
+        if keep == length:
+            return (value if copy is None else copy), remaining
+        if copy is None:
+            copy = list(value[:keep])
+        del copy[keep:]
+        marker = "[{0} more items truncated]".format(length - keep)
+        copy.append(marker)
+        return copy, remaining - len(marker) - 4
@@ -44,6 +44,68 @@ def test_type():
     assert result["type"] == "thing-happened"
 
 
+def test_type_does_not_stick_to_the_logger():
+    stream = StringIO()
+    cazoo_logger.config(stream)
+
+    logger = cazoo_logger.empty()
+    logger.info("hello", type="thing-happened")
+    logger.info("hello again")
+    logger.info("with data", extra={"a": 1}, type="other-thing")
+    logger.info("with data again", extra={"a": 1})
+
+    results = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    assert [result.get("type") for result in results] == [
+        "thing-happened",
+        None,
+        "other-thing",
+        None,
+    ]
+    assert dict(logger.context) == {}
+
+
+def test_process_only_copies_for_extra_or_type():
+    logger = cazoo_logger.empty().with_context(request_id="abc")
+    extra = {"a": 1}
+
+    _, plain = logger.process("msg", {})
+    _, with_extra = logger.process("msg", {"extra": extra})
+    _, with_type = logger.process("msg", {"type": "thing"})
+
+    assert plain["extra"]["context"] is logger.context["context"]
+    assert logger.process("msg", {})[1]["extra"] is plain["extra"]
+    assert with_extra["extra"]["data"] == extra
+    assert with_extra["extra"]["data"] is not extra
+    assert with_extra["extra"]["context"] == {"request_id": "abc"}
+    assert with_type["extra"]["type"] == "thing"
+    assert "type" not in logger.context
+
+
+def test_changes_to_the_context_are_logged():
+    stream = StringIO()
+    cazoo_logger.config(stream)
+    parent = cazoo_logger.empty().with_context(request_id="abc")
+    child = parent.with_data(order_id="o-1")
+
+    child.info("before")
+    child.context["type"] = "order"
+    parent.context["context"] = {"request_id": "def"}
+    child.info("after")
+    del child.context["type"]
+    child.info("removed")
+
+    before, after, removed = [
+        json.loads(line) for line in stream.getvalue().splitlines()
+    ]
+    assert "type" not in before
+    assert before["context"] == {"request_id": "abc"}
+    assert after["type"] == "order"
+    assert after["context"] == {"request_id": "def"}
+    assert after["data"] == {"order_id": "o-1"}
+    assert "type" not in removed
+
+
 def test_data():
 
     stream = StringIO()
@@ -0,0 +1,122 @@
+import json
+import logging
+from io import BytesIO, StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.handlers import CoalescingHandler
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+class CountingStream(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def messages(stream):
+    return [json.loads(line)["msg"] for line in stream.getvalue().splitlines()]
+
+
+@pytest.fixture
+def stream():
+    stream = CountingStream()
+    cazoo_logger.config(stream, coalesce=True)
+    return stream
+
+
+def test_lines_are_held_until_the_end_of_the_invocation(stream):
+    @ls.handler_logger("cloudwatch")
+    def handler(event, context, logger):
+        for i in range(10):
+            logger.info("line %s", i)
+        assert stream.getvalue() == ""
+
+    handler(event, LambdaContext())
+
+    lines = ["line {0}".format(i) for i in range(10)]
+    assert messages(stream) == ["Logging event data"] + lines
+    assert stream.writes == 1
+
+
+def test_errors_are_written_immediately():
+    stream = StringIO()
+    cazoo_logger.config(stream, coalesce=True)
+    logger = cazoo_logger.empty()
+
+    logger.info("before")
+    logger.error("broken")
+
+    assert messages(stream) == ["before", "broken"]
+
+
+def test_unhandled_exceptions_are_written(stream):
+    @ls.exception_logger("empty")
+    def handler(event, context, logger):
+        logger.info("before")
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        handler(event, LambdaContext())
+
+    assert messages(stream) == [
+        "Logging event data",
+        "before",
+        "Unhandled exception in Lambda",
+    ]
+
+
+def test_lines_are_written_at_the_size_threshold():
+    stream = BytesIO()
+    handler = CoalescingHandler(stream, binary=True, max_bytes=100, max_age=60)
+    handler.setFormatter(JsonFormatter())
+
+    attributes = {"msg": "x" * 30, "levelname": "INFO", "levelno": logging.INFO}
+    for i in range(5):
+        handler.handle(logging.makeLogRecord(attributes))
+
+    # Each line is 57 bytes, so lines are written in pairs and the last is held.
+    assert len(stream.getvalue().splitlines()) == 4
+    handler.flush()
+    assert len(stream.getvalue().splitlines()) == 5
+
+
+def test_lines_are_written_at_the_age_threshold():
+    stream = StringIO()
+    cazoo_logger.config(stream, coalesce=True, coalesce_seconds=0)
+
+    cazoo_logger.empty().info("hello")
+
+    assert messages(stream) == ["hello"]
+
+
+def test_async_mode_cannot_coalesce():
+    with pytest.raises(ValueError):
+        cazoo_logger.config(StringIO(), async_mode=True, coalesce=True)
+
+
+def test_failed_writes_report_the_last_record():
+    class BrokenStream(StringIO):
+        def write(self, text):
+            raise OSError("closed")
+
+    errors = []
+    handler = CoalescingHandler(BrokenStream(), max_age=60)
+    handler.setFormatter(JsonFormatter())
+    handler.handleError = errors.append
+
+    for msg in ("first", "last"):
+        attributes = {"msg": msg, "levelname": "INFO", "levelno": logging.INFO}
+        handler.handle(logging.makeLogRecord(attributes))
+    handler.flush()
+
+    assert [record.msg for record in errors] == ["last"]
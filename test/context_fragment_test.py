@@ -0,0 +1,102 @@
+import json
+import logging
+from io import StringIO
+
+from cazoo_logger.contexts import CloudwatchContext
+from cazoo_logger.encoders import StdlibEncoder
+from cazoo_logger.formatters import JsonFormatter
+from . import LambdaContext
+
+event = {
+    "source": "aws.events",
+    "detail-type": "Scheduled Event",
+    "id": "cdc73f9d-aea9-11e3-9d5a-835b769c0d9c",
+}
+
+
+class CountingEncoder(StdlibEncoder):
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+
+    def dumps(self, obj):
+        self.encoded.append(obj)
+        return super().dumps(obj)
+
+
+def logger_with_encoder(encoder):
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter(encoder=encoder))
+    logger = logging.Logger("fragments")
+    logger.addHandler(handler)
+    return CloudwatchContext(event, LambdaContext(), logger), stream
+
+
+def test_context_is_encoded_once_per_adapter():
+    encoder = CountingEncoder()
+    log, stream = logger_with_encoder(encoder)
+
+    for i in range(3):
+        log.info("line %s", i, extra={"i": i})
+
+    context = log.context["context"]
+    assert sum(1 for obj in encoder.encoded if obj is context) == 1
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["data"] for line in lines] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert all(line["context"] == context for line in lines)
+
+
+def test_spliced_output_matches_a_full_encoding():
+    log, stream = logger_with_encoder(StdlibEncoder())
+    log.info("hello", type="greeting")
+
+    expected = json.dumps(
+        {
+            "context": log.context["context"],
+            "type": "greeting",
+            "msg": "hello",
+            "level": "info",
+        }
+    )
+    assert stream.getvalue() == expected + "\n"
+
+
+def test_with_context_caches_its_own_context():
+    log, stream = logger_with_encoder(StdlibEncoder())
+    log.with_context(request_id="abc-123").info("hello")
+
+    assert json.loads(stream.getvalue())["context"] == {"request_id": "abc-123"}
+
+
+def test_context_replaced_by_a_filter_is_encoded_again():
+    log, stream = logger_with_encoder(StdlibEncoder())
+
+    def scrub(record):
+        record.context = {"request_id": "scrubbed"}
+        return True
+
+    log.logger.addFilter(scrub)
+    log.info("hello")
+
+    assert json.loads(stream.getvalue())["context"] == {"request_id": "scrubbed"}
+
+
+def test_context_changed_in_place_is_encoded_again():
+    log, stream = logger_with_encoder(StdlibEncoder())
+    log.info("before")
+
+    log.context["context"]["order_id"] = "o-1"
+    log.info("after")
+
+    before, after = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert "order_id" not in before["context"]
+    assert after["context"]["order_id"] == "o-1"
+
+
+def test_the_fragment_is_not_part_of_the_context():
+    log, _ = logger_with_encoder(StdlibEncoder())
+
+    assert list(log.context) == ["context"]
+    assert list(log.with_context(order_id="o-1").context) == ["context"]
@@ -0,0 +1,72 @@
+import json
+import logging
+from datetime import datetime
+from io import StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger import encoders
+from cazoo_logger.formatters import JsonFormatter, json_formatter
+
+record = {
+    "context": {
+        "request_id": "abc-123",
+        "function": {"name": "do-things", "version": "0.1.2.3"},
+    },
+    "data": {"vrm": "LP12 KZM", "price": 12.5, "tags": ["a", "b"], "note": "café"},
+    "type": "thing-happened",
+    "msg": "Hello world",
+    "level": "info",
+}
+
+
+def test_stdlib_encoder_matches_json_dumps():
+    encoder = encoders.get_encoder("json", json_formatter)
+
+    assert encoder.dumps(record) == json.dumps(record, default=json_formatter)
+
+
+@pytest.mark.parametrize("name", encoders.available_encoders()[1:])
+def test_accelerated_encoders_match_compact_stdlib(name):
+    compact = encoders.StdlibEncoder(json_formatter, compact=True)
+    encoder = encoders.get_encoder(name, json_formatter)
+
+    value = dict(record, data={"when": datetime(2020, 1, 2, 3, 4, 5)})
+
+    assert encoder.dumps(value) == compact.dumps(value)
+    assert encoder.dumpb(record) == compact.dumpb(record)
+
+
+def test_auto_encoder_falls_back_for_values_it_cannot_encode():
+    encoder = encoders.get_encoder("auto", json_formatter)
+    value = {"big": 2 ** 70, 1: "int key"}
+
+    assert json.loads(encoder.dumps(value)) == {"big": 2 ** 70, "1": "int key"}
+
+
+def test_unknown_encoder_fails():
+    with pytest.raises(ValueError):
+        encoders.get_encoder("nope")
+
+
+def test_config_with_auto_encoder():
+    stream = StringIO()
+    cazoo_logger.config(stream, encoder="auto")
+
+    logger = cazoo_logger.empty()
+    logger.info("Hello %s", "world", extra={"when": datetime(2020, 1, 2)})
+    result = json.loads(stream.getvalue())
+
+    assert result == {
+        "msg": "Hello world",
+        "level": "info",
+        "data": {"when": "2020-01-02T00:00:00"},
+    }
+
+
+def test_formatter_accepts_encoder_instance():
+    formatter = JsonFormatter(encoder=encoders.StdlibEncoder(compact=True))
+    line = formatter.format(logging.makeLogRecord({"msg": "hi", "levelname": "INFO"}))
+
+    assert line == '{"msg":"hi","level":"info"}'
@@ -0,0 +1,49 @@
+import json
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.fingerprint import EventFingerprints, fingerprint
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+def test_equal_events_have_equal_fingerprints():
+    reordered = {"id": "12345", "detail-type": "test event", "source": "test_event"}
+
+    assert fingerprint(event) == fingerprint(reordered)
+    assert fingerprint(event) != fingerprint(dict(event, id="67890"))
+    assert len(fingerprint(event)) == 32
+
+
+def test_events_with_mixed_keys_have_fingerprints():
+    assert fingerprint({1: "a", "b": 2}) == fingerprint({1: "a", "b": 2})
+
+
+def test_fingerprints_are_forgotten_least_recently_seen_first():
+    seen = EventFingerprints(max_size=2)
+
+    assert [seen.first_seen(digest) for digest in "abab"] == [True, True, False, False]
+    assert seen.first_seen("c")
+    assert seen.first_seen("a")
+    assert not seen.first_seen("c")
+
+
+def test_repeated_events_are_logged_in_full_once(capsys, monkeypatch):
+    # As in a fresh container, where config() hasn't been called.
+    monkeypatch.setattr(cazoo_logger, "_configured", None)
+
+    @ls.handler_logger("cloudwatch", dedupe_events=True)
+    def handler(event, context, logger):
+        return "ok"
+
+    for request_id in ("first", "retry", "replay"):
+        handler(event, LambdaContext(request_id=request_id))
+    handler(dict(event, id="67890"), LambdaContext(request_id="other"))
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    data = [line["data"] for line in lines]
+    digest = fingerprint(event)
+    assert data[0] == {"event": event, "event_fingerprint": digest}
+    assert data[1] == data[2] == {"event_fingerprint": digest}
+    assert data[3]["event"]["id"] == "67890"
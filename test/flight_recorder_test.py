@@ -0,0 +1,83 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.handlers import FlightRecorder
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+def messages(stream):
+    return [json.loads(line)["msg"] for line in stream.getvalue().splitlines()]
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    stream = StringIO()
+    cazoo_logger.config(stream, flight_recorder=100)
+    return stream
+
+
+def test_debug_records_are_discarded_when_nothing_fails(stream):
+    @ls.exception_logger("cloudwatch", has_pii=True)
+    def handler(event, context, logger):
+        logger.debug("detail")
+        logger.info("progress")
+        return "ok"
+
+    handler(event, LambdaContext())
+
+    assert messages(stream) == ["progress"]
+
+
+def test_debug_records_are_written_when_the_handler_raises(stream):
+    @ls.exception_logger("cloudwatch", has_pii=True)
+    def handler(event, context, logger):
+        logger.debug("detail %s", 1)
+        logger.info("progress")
+        logger.debug("detail %s", 2)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        handler(event, LambdaContext())
+
+    assert messages(stream) == [
+        "progress",
+        "detail 1",
+        "detail 2",
+        "Unhandled exception in Lambda",
+    ]
+
+
+def test_buffer_is_cleared_between_invocations(stream):
+    @ls.exception_logger("empty", has_pii=True)
+    def handler(event, context, logger):
+        logger.debug("invocation %s", event["n"])
+        if event["n"] == 2:
+            logger.error("failed")
+
+    handler({"n": 1}, LambdaContext())
+    handler({"n": 2}, LambdaContext())
+
+    assert messages(stream) == ["invocation 2", "failed"]
+
+
+def test_buffer_is_bounded():
+    stream = StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(cazoo_logger.JsonFormatter())
+    recorder = FlightRecorder(target, capacity=2)
+    logger = logging.Logger("recorder")
+    logger.addHandler(recorder)
+
+    for i in range(5):
+        logger.debug("detail %s", i)
+    logger.error("failed")
+
+    assert messages(stream) == ["detail 3", "detail 4", "failed"]
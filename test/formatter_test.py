@@ -0,0 +1,102 @@
+import json
+import logging
+from collections import ChainMap
+from io import StringIO
+
+import cazoo_logger
+from cazoo_logger.contexts import ContextualAdapter
+from cazoo_logger.encoders import StdlibEncoder
+from cazoo_logger.formatters import JsonFormatter
+
+
+def make_record(**attrs):
+    return logging.makeLogRecord(dict({"msg": "hi", "levelname": "INFO"}, **attrs))
+
+
+def test_fields_are_written_in_a_fixed_order():
+    formatter = JsonFormatter()
+    record = make_record(type="thing", data={"a": 1}, context={"request_id": "r"})
+
+    assert list(json.loads(formatter.format(record))) == [
+        "context",
+        "data",
+        "type",
+        "msg",
+        "level",
+    ]
+
+
+def test_falsy_fields_are_dropped():
+    formatter = JsonFormatter()
+    record = make_record(type="", data={}, context=None)
+
+    assert json.loads(formatter.format(record)) == {"msg": "hi", "level": "info"}
+
+
+def test_unsupported_attributes_are_ignored():
+    formatter = JsonFormatter()
+    record = make_record(vrm="LP12 KZM")
+
+    assert json.loads(formatter.format(record)) == {"msg": "hi", "level": "info"}
+
+
+def test_exceptions_do_not_modify_shared_data():
+    stream = StringIO()
+    cazoo_logger.config(stream)
+    data = {"vrm": "LP12 KZM"}
+    logger = ContextualAdapter(logging.root, ChainMap({"data": data}))
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Uh oh")
+    logger.info("Carrying on")
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["data"]["error"]["name"] == "ValueError"
+    assert second["data"] == {"vrm": "LP12 KZM"}
+    assert data == {"vrm": "LP12 KZM"}
+
+
+def test_format_batch_joins_lines():
+    formatter = JsonFormatter()
+    records = [make_record(msg="one"), make_record(msg="two", data={"a": 1})]
+
+    assert formatter.format_batch(records) == "".join(
+        formatter.format(record) + "\n" for record in records
+    )
+    assert formatter.format_batch(records, binary=True) == "".join(
+        formatter.format(record) + "\n" for record in records
+    ).encode("utf-8")
+    assert formatter.format_batch([]) == ""
+
+
+def test_format_batch_leaves_out_only_the_records_that_fail():
+    formatter = JsonFormatter()
+    bad = make_record(msg="%d rows", args=("many",))
+    records = [make_record(msg="one"), bad, make_record(msg="two")]
+    errors = []
+
+    for binary in (False, True):
+        lines = formatter.format_batch(records, binary, errors.append).splitlines()
+
+        assert [json.loads(line)["msg"] for line in lines] == ["one", "two"]
+    assert errors == [bad, bad]
+
+
+def test_format_batch_encodes_a_shared_context_once():
+    encoded = []
+
+    class CountingEncoder(StdlibEncoder):
+        def dumps(self, obj):
+            encoded.append(obj)
+            return super().dumps(obj)
+
+    formatter = JsonFormatter(encoder=CountingEncoder())
+    context = {"request_id": "r"}
+    records = [make_record(context=context, msg=str(i)) for i in range(3)]
+
+    lines = formatter.format_batch(records).splitlines()
+
+    assert lines == [formatter.format(record) for record in records]
+    assert sum(1 for obj in encoded if obj is context) == 1
@@ -0,0 +1,115 @@
+import json
+import logging
+from io import BytesIO, StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.handlers import BinaryStreamHandler, end_invocation
+from cazoo_logger.schema import DEFAULT_SCHEMA
+from . import LambdaContext
+
+event = {
+    "source": "aws.events",
+    "detail-type": "Scheduled Event",
+    "id": "cdc73f9d-aea9-11e3-9d5a-835b769c0d9c",
+}
+
+
+def test_binary_config_writes_utf8_lines():
+    stream = BytesIO()
+    cazoo_logger.config(stream, binary=True)
+
+    logger = cazoo_logger.cloudwatch(event, LambdaContext())
+    logger.info("Hello %s", "café", extra={"vrm": "LP12 KZM"})
+    logger.info("Goodbye")
+
+    first, second = stream.getvalue().decode("utf-8").splitlines()
+    assert json.loads(first)["msg"] == "Hello café"
+    assert json.loads(first)["data"] == {"vrm": "LP12 KZM"}
+    assert json.loads(second)["context"]["request_id"] == "request_id"
+
+
+@pytest.mark.parametrize("encoder", ["json", "auto"])
+@pytest.mark.parametrize("schema", [None, DEFAULT_SCHEMA])
+def test_format_bytes_matches_format(encoder, schema):
+    formatter = JsonFormatter(encoder=encoder, schema=schema)
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.Logger("bytes")
+    logger.addHandler(handler)
+
+    log = cazoo_logger.contexts.CloudwatchContext(event, LambdaContext(), logger)
+    log.info("Hello", extra={"price": 12.5})
+    logger.info("No context")
+
+    for record in records:
+        assert formatter.format_bytes(record) == formatter.format(record).encode()
+
+
+def test_binary_handler_encodes_plain_formatters():
+    stream = BytesIO()
+    handler = BinaryStreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+
+    handler.handle(logging.makeLogRecord({"msg": "café", "levelname": "INFO"}))
+
+    assert stream.getvalue() == "INFO café\n".encode("utf-8")
+
+
+def test_async_mode_writes_everything_in_order_on_flush():
+    stream = StringIO()
+    cazoo_logger.config(stream, async_mode=True, queue_size=10)
+
+    logger = cazoo_logger.empty()
+    for i in range(100):
+        logger.info("line %s", i)
+    end_invocation()
+
+    lines = [json.loads(line)["msg"] for line in stream.getvalue().splitlines()]
+    assert lines == ["line {0}".format(i) for i in range(100)]
+
+
+def test_async_mode_interpolates_messages_when_logged():
+    stream = StringIO()
+    cazoo_logger.config(stream, async_mode=True)
+    values = ["before"]
+
+    cazoo_logger.empty().info("value is %s", values)
+    values[0] = "after"
+    end_invocation()
+
+    assert json.loads(stream.getvalue())["msg"] == "value is ['before']"
+
+
+@pytest.fixture
+def async_stream():
+    stream = BytesIO()
+    cazoo_logger.config(stream, async_mode=True, binary=True)
+    return stream
+
+
+def test_decorators_drain_async_mode_before_returning(async_stream):
+    @ls.handler_logger("cloudwatch")
+    def handler(event, context, logger):
+        for i in range(50):
+            logger.info("line %s", i)
+        return "done"
+
+    assert handler(event, LambdaContext()) == "done"
+    lines = async_stream.getvalue().splitlines()
+    lines = [json.loads(line)["msg"] for line in lines]
+    assert lines == ["Logging event data"] + ["line {0}".format(i) for i in range(50)]
+
+
+def test_reconfiguring_stops_the_writer_thread():
+    cazoo_logger.config(StringIO(), async_mode=True)
+    cazoo_logger.empty().info("start the writer")
+    [handler] = logging.root.handlers
+
+    cazoo_logger.config(StringIO())
+
+    assert not handler._thread.is_alive()
@@ -0,0 +1,150 @@
+import gzip
+import json
+import logging
+from io import StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger import offload
+from cazoo_logger.offload import LocalDirectorySink, OffloadSink, Offloader
+
+
+class MemorySink(OffloadSink):
+    def __init__(self):
+        self.objects = {}
+
+    def put(self, key, body):
+        self.objects[key] = body
+        return "memory://" + key
+
+
+class BrokenSink(OffloadSink):
+    def put(self, key, body):
+        raise OSError("no space left")
+
+
+payload = {"rows": [{"id": i, "name": "x" * 50} for i in range(100)]}
+
+
+def _record(**data):
+    return logging.makeLogRecord({"msg": "Exported", "data": data})
+
+
+def test_small_values_stay_on_the_line():
+    sink = MemorySink()
+    record = _record(count=3, rows=[1, 2, 3])
+    data = record.data
+
+    Offloader(sink, threshold=1000).filter(record)
+
+    assert record.data is data
+    assert sink.objects == {}
+
+
+def test_large_values_are_replaced_with_a_pointer():
+    sink = MemorySink()
+    record = _record(count=100, payload=payload)
+
+    Offloader(sink, threshold=1000).filter(record)
+
+    pointer = record.data["payload"]["offloaded"]
+    assert record.data["count"] == 100
+    [(key, body)] = sink.objects.items()
+    assert pointer["location"] == "memory://" + key
+    assert key == "{0}/{1}.json.gz".format(pointer["sha256"][:2], pointer["sha256"])
+    assert json.loads(gzip.decompress(body)) == payload
+    assert pointer["size"] == len(gzip.decompress(body))
+
+
+def test_long_keys_count_towards_the_threshold():
+    sink = MemorySink()
+    value = {"k" * 170 + str(i): i for i in range(1500)}
+    record = _record(payload=value)
+
+    Offloader(sink).filter(record)
+
+    assert record.data["payload"]["offloaded"]["size"] > 64 * 1024
+
+
+def test_values_just_under_the_threshold_stay_on_the_line():
+    sink = MemorySink()
+    value = {"é" * 20: "ü" * 40}
+    size = len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+
+    for threshold, offloaded in ((size, False), (size - 1, True)):
+        record = _record(payload=value)
+        Offloader(sink, threshold=threshold).filter(record)
+
+        assert ("offloaded" in record.data["payload"]) is offloaded
+
+
+def test_identical_payloads_are_written_once():
+    class CountingSink(MemorySink):
+        puts = 0
+
+        def put(self, key, body):
+            self.puts += 1
+            return super().put(key, body)
+
+    sink = CountingSink()
+    offloader = Offloader(sink, threshold=1000)
+    records = [_record(payload=dict(payload)) for _ in range(3)]
+
+    for record in records:
+        offloader.filter(record)
+
+    assert sink.puts == 1
+    assert len({json.dumps(record.data) for record in records}) == 1
+
+
+def test_a_value_logged_again_is_not_encoded_again(monkeypatch):
+    encoded = []
+    dumps = json.dumps
+    monkeypatch.setattr(
+        offload.json,
+        "dumps",
+        lambda value, **kw: encoded.append(1) or dumps(value, **kw),
+    )
+    offloader = Offloader(MemorySink(), threshold=1000)
+    value = {"rows": [dict(row) for row in payload["rows"]]}
+
+    first, second = _record(payload=value), _record(payload=value)
+    offloader.filter(first)
+    offloader.filter(second)
+    value["rows"][0]["name"] = "changed"
+    changed = _record(payload=value)
+    offloader.filter(changed)
+
+    assert len(encoded) == 2
+    assert first.data == second.data
+    assert changed.data != first.data
+
+
+def test_sinks_must_implement_put():
+    class NoPut(OffloadSink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoPut()
+
+
+def test_failed_writes_leave_the_value():
+    record = _record(payload=payload)
+
+    Offloader(BrokenSink(), threshold=1000).filter(record)
+
+    assert record.data["payload"] is payload
+
+
+def test_local_directory_sink(tmp_path):
+    stream = StringIO()
+    offloader = Offloader(LocalDirectorySink(str(tmp_path)), threshold=1000)
+    cazoo_logger.config(stream, offload=offloader)
+
+    cazoo_logger.empty().info("Exported", extra={"payload": payload})
+
+    pointer = json.loads(stream.getvalue())["data"]["payload"]["offloaded"]
+    assert pointer["location"].startswith(str(tmp_path / "logs"))
+    with gzip.open(pointer["location"]) as offloaded:
+        assert json.load(offloaded) == payload
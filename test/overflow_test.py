@@ -0,0 +1,110 @@
+import json
+import logging
+import threading
+from collections import ChainMap
+from io import StringIO
+
+import pytest
+
+from cazoo_logger.contexts import ContextualAdapter
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.handlers import AsyncHandler, end_invocation
+
+
+class BlockingStream(StringIO):
+    """A stream whose first write waits until the test releases it."""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(text)
+
+
+def blocked_logger(**kwargs):
+    stream = BlockingStream()
+    handler = AsyncHandler(stream, capacity=2, **kwargs)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.Logger("overflow")
+    logger.addHandler(handler)
+    log = ContextualAdapter(logger, ChainMap())
+
+    # The writer takes the first record and blocks writing it.
+    log.info("first")
+    assert stream.writing.wait(5)
+    return log, handler, stream
+
+
+def finish(log, stream):
+    stream.release.set()
+    end_invocation(log)
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_drop_newest():
+    log, handler, stream = blocked_logger(overflow="drop_newest")
+    for i in range(5):
+        log.info("line %s", i)
+
+    lines = finish(log, stream)
+
+    assert [line["msg"] for line in lines[:3]] == ["first", "line 0", "line 1"]
+    assert lines[3]["msg"] == "Dropped 3 log records"
+    assert lines[3]["data"] == {
+        "policy": "drop_newest",
+        "dropped": 3,
+        "levels": {"info": 3},
+    }
+
+
+def test_drop_oldest():
+    log, handler, stream = blocked_logger(overflow="drop_oldest")
+    for i in range(5):
+        log.info("line %s", i)
+
+    lines = finish(log, stream)
+
+    assert [line["msg"] for line in lines[:3]] == ["first", "line 3", "line 4"]
+    assert lines[3]["data"]["dropped"] == 3
+
+
+def test_drop_below_keeps_warnings():
+    log, handler, stream = blocked_logger(overflow="drop_below")
+    log.info("kept 1")
+    log.info("kept 2")
+    log.debug("dropped")
+    log.info("dropped")
+
+    # The warning blocks until there is space, so release the writer first.
+    threading.Timer(0.1, stream.release.set).start()
+    log.warning("warning")
+    lines = finish(log, stream)
+
+    assert [line["msg"] for line in lines[:4]] == [
+        "first",
+        "kept 1",
+        "kept 2",
+        "warning",
+    ]
+    assert lines[4]["data"]["levels"] == {"debug": 1, "info": 1}
+
+
+def test_summary_is_only_logged_once():
+    log, handler, stream = blocked_logger(overflow="drop_newest")
+    for i in range(3):
+        log.info("line %s", i)
+    finish(log, stream)
+
+    end_invocation(log)
+
+    assert handler.dropped == {}
+    assert stream.getvalue().count("Dropped") == 1
+
+
+def test_invalid_policy_fails():
+    with pytest.raises(ValueError):
+        AsyncHandler(overflow="shrug")
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.projection import compile_projection
+from . import LambdaContext
+
+event = {
+    "source": "orders",
+    "detail-type": "Order placed",
+    "id": "12345",
+    "detail": {
+        "order": {"id": 1, "lines": [{"sku": "a", "price": 1}, {"sku": "b"}]},
+        "customer": {"email": "ada@example.com"},
+        "history": [{"id": 1, "note": "x"}] * 3,
+    },
+}
+
+
+def test_projection_keeps_only_the_paths():
+    project = compile_projection(["source", "detail.order.id", "detail.missing.id"])
+
+    assert project(event) == {"source": "orders", "detail": {"order": {"id": 1}}}
+
+
+def test_projection_walks_through_lists():
+    project = compile_projection(["detail.order.lines.price"])
+
+    assert project(event) == {"detail": {"order": {"lines": [{"price": 1}]}}}
+
+
+def test_projection_wildcards():
+    project = compile_projection(["detail.*.id"])
+
+    assert project(event) == {
+        "detail": {"order": {"id": 1}, "history": [{"id": 1}] * 3}
+    }
+
+
+def test_projection_of_nothing_is_empty():
+    assert compile_projection(["nope"])(event) == {}
+    assert compile_projection(["source.nested"])(event) == {}
+
+
+def test_invalid_paths_fail():
+    with pytest.raises(ValueError):
+        compile_projection(["detail."])
+
+
+def test_decorators_log_only_the_event_fields(capsys, monkeypatch):
+    # As in a fresh container, where config() hasn't been called.
+    monkeypatch.setattr(cazoo_logger, "_configured", None)
+
+    @ls.exception_logger("cloudwatch", event_fields=["id", "detail.order.id"])
+    def handler(event, context, log):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        handler(event, LambdaContext())
+
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    expected = {"id": "12345", "detail": {"order": {"id": 1}}}
+    assert lines[0]["data"] == {"event": expected}
+    assert lines[1]["data"]["event"] == expected
@@ -0,0 +1,112 @@
+import json
+import logging
+from collections import ChainMap
+from io import StringIO
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.contexts import ContextualAdapter
+from cazoo_logger.filters import RateLimitFilter
+from cazoo_logger.formatters import JsonFormatter
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def limited_logger(**kwargs):
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.Logger("limited")
+    logger.addHandler(handler)
+    clock = Clock()
+    handler.addFilter(RateLimitFilter(logger=logger, clock=clock, **kwargs))
+    return ContextualAdapter(logger, ChainMap()), stream, clock
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_templates_are_limited_after_a_burst():
+    log, stream, clock = limited_logger(rate=1, burst=3)
+
+    for i in range(10):
+        log.warning("Bad record %s", i)
+    log.info("Different template")
+    clock.now = 2
+    log.warning("Bad record %s", 10)
+
+    assert [line["msg"] for line in lines(stream)] == [
+        "Bad record 0",
+        "Bad record 1",
+        "Bad record 2",
+        "Different template",
+        "Bad record 10",
+    ]
+
+
+def test_levels_are_limited_separately():
+    log, stream, clock = limited_logger(rate=1, burst=1)
+
+    log.info("Same template")
+    log.info("Same template")
+    log.error("Same template")
+
+    assert [line["level"] for line in lines(stream)] == ["info", "error"]
+
+
+def test_summaries_are_logged_periodically():
+    log, stream, clock = limited_logger(rate=1, burst=1, summary_interval=60)
+
+    for i in range(5):
+        log.warning("Bad record %s", i)
+    clock.now = 61
+    log.info("Something else")
+
+    summary = lines(stream)[1]
+    assert summary["msg"] == "Suppressed 4 similar log messages"
+    assert summary["type"] == "log-messages-suppressed"
+    assert summary["data"] == {
+        "template": "Bad record %s",
+        "level": "warning",
+        "suppressed": 4,
+    }
+
+
+def test_summaries_are_logged_at_the_end_of_the_invocation():
+    stream = StringIO()
+    cazoo_logger.config(stream, rate_limit=1, rate_limit_burst=2)
+
+    @ls.handler_logger("cloudwatch")
+    def handler(event, context, logger):
+        for i in range(5):
+            logger.warning("Bad record %s", i)
+
+    handler(event, LambdaContext())
+
+    *written, summary = lines(stream)
+    assert [line["msg"] for line in written] == [
+        "Logging event data",
+        "Bad record 0",
+        "Bad record 1",
+    ]
+    assert summary["data"]["suppressed"] == 3
+    assert summary["context"]["request_id"] == "request_id"
+
+
+def test_unhashable_messages_are_limited_by_their_text():
+    log, stream, clock = limited_logger(rate=1, burst=2)
+
+    for _ in range(5):
+        log.info({"a": 1})
+
+    assert [line["msg"] for line in lines(stream)] == ["{'a': 1}", "{'a': 1}"]
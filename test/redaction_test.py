@@ -0,0 +1,211 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger.redaction import (
+    DEFAULT_PATTERNS,
+    REDACTED,
+    Pseudonymiser,
+    RedactionFilter,
+    Redactor,
+)
+from . import LambdaContext
+
+event = {
+    "source": "test_event",
+    "detail-type": "test event",
+    "id": "12345",
+    "detail": {
+        "customer": {"first_name": "Ada", "email_address": "ada@example.com"},
+        "vehicles": [{"vrm": "LP12 KZM", "owner": "Ada"}, {"vrm": "AB12 CDE"}],
+        "order": {"total": 9995},
+    },
+}
+
+
+def test_fields_are_redacted_at_any_depth():
+    redactor = Redactor(fields=["first_name", "email_address"])
+
+    result = redactor.redact(event)
+
+    assert result["detail"]["customer"] == {
+        "first_name": REDACTED,
+        "email_address": REDACTED,
+    }
+    assert event["detail"]["customer"]["first_name"] == "Ada"
+
+
+def test_unchanged_subtrees_are_shared():
+    redactor = Redactor(fields=["first_name"])
+
+    result = redactor.redact(event)
+
+    assert result is not event
+    assert result["detail"] is not event["detail"]
+    assert result["detail"]["vehicles"] is event["detail"]["vehicles"]
+    assert result["detail"]["order"] is event["detail"]["order"]
+
+
+def test_values_without_personal_data_are_returned_as_is():
+    redactor = Redactor(fields=["surname"])
+
+    assert redactor.redact(event) is event
+
+
+def test_paths_walk_through_lists_and_wildcards():
+    redactor = Redactor(paths=["data.detail.vehicles.owner", "data.*.order"])
+
+    result = redactor.redact(event, "data")
+
+    assert result["detail"]["vehicles"] == [
+        {"vrm": "LP12 KZM", "owner": REDACTED},
+        {"vrm": "AB12 CDE"},
+    ]
+    assert result["detail"]["order"] == REDACTED
+    assert result["detail"]["customer"] is event["detail"]["customer"]
+
+
+def test_paths_only_match_their_root():
+    redactor = Redactor(paths=["context.detail"])
+
+    assert redactor.redact(event, "data") is event
+
+
+def test_invalid_paths_fail():
+    with pytest.raises(ValueError):
+        Redactor(paths=["data..email"])
+
+
+def test_config_redacts_data_and_context():
+    stream = StringIO()
+    cazoo_logger.config(stream, redact=["email_address", "request_id"])
+    log = cazoo_logger.cloudwatch(event, LambdaContext())
+
+    log.info("Found customer", extra=event["detail"]["customer"])
+    log.info("Found customer again", extra=event["detail"]["customer"])
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["data"] == {"first_name": "Ada", "email_address": REDACTED}
+    assert first["context"]["request_id"] == REDACTED
+    assert second["context"] == first["context"]
+
+
+def test_filter_reuses_the_redacted_context():
+    redaction = RedactionFilter(Redactor(fields=["request_id"]))
+    log = cazoo_logger.cloudwatch(event, LambdaContext())
+    records = []
+    for _ in range(2):
+        record = logging.makeLogRecord(dict(log.process("msg", {})[1]["extra"]))
+        redaction.filter(record)
+        records.append(record)
+
+    assert records[0].context is records[1].context
+    assert records[0]._context_fragment is records[1]._context_fragment
+
+
+def test_filter_keeps_each_records_own_context():
+    redaction = RedactionFilter(Redactor(fields=["email"]))
+    logs = [
+        cazoo_logger.empty().with_context(request_id=request_id, email="a@b.com")
+        for request_id in ("first", "second")
+    ]
+
+    for log in logs * 2:
+        record = logging.makeLogRecord(dict(log.process("msg", {})[1]["extra"]))
+        redaction.filter(record)
+
+        expected = dict(log.context["context"], email=REDACTED)
+        assert record.context == expected
+        assert record._context_fragment.context is record.context
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Contact ada@example.com now", "Contact EMAIL REMOVED now"),
+        ("Call 07700 900123", "Call PHONE REMOVED"),
+        ("Call +44 7700 900123", "Call PHONE REMOVED"),
+        ("Paid with 4111 1111 1111 1111", "Paid with CARD REMOVED"),
+        ("Order 4111 1111 1111 1112", "Order 4111 1111 1111 1112"),
+        ("Deliver to SW1A 1AA", "Deliver to POSTCODE REMOVED"),
+        ("Priced LP12 KZM", "Priced VRM REMOVED"),
+        ("Priced vehicle", "Priced vehicle"),
+    ],
+)
+def test_patterns_scrub_strings(text, expected):
+    redactor = Redactor(patterns=True)
+
+    assert redactor.scrub(text) == expected
+
+
+def test_patterns_leave_containers_without_matches_uncopied():
+    redactor = Redactor(patterns=True)
+    value = {"order": {"id": 12345, "notes": ["left at door"]}, "to": "SW1A 1AA"}
+
+    result = redactor.redact(value)
+
+    assert result == {
+        "order": {"id": 12345, "notes": ["left at door"]},
+        "to": "POSTCODE REMOVED",
+    }
+    assert result["order"] is value["order"]
+    assert redactor.redact(value["order"]) is value["order"]
+
+
+def test_custom_patterns_and_short_strings():
+    redactor = Redactor(patterns={"secret": (r"s3cr3t\w*", "SECRET")}, min_length=6)
+
+    assert redactor.scrub("s3cr3t") == "SECRET"
+    assert redactor.scrub("s3cr") == "s3cr"
+
+
+def test_filter_scrubs_the_message():
+    stream = StringIO()
+    cazoo_logger.config(stream, redact=Redactor(patterns=True))
+
+    cazoo_logger.empty().info("Emailed %s", "ada@example.com", extra={"n": 1})
+
+    line = json.loads(stream.getvalue())
+    assert line["msg"] == "Emailed EMAIL REMOVED"
+    assert line["data"] == {"n": 1}
+
+
+def test_pseudonymiser_gives_equal_values_equal_tokens():
+    pseudonymise = Pseudonymiser(key="secret", length=12)
+
+    token = pseudonymise("ada@example.com")
+
+    assert token.startswith("pii_") and len(token) == 16
+    assert pseudonymise("ada@example.com") == token
+    assert pseudonymise("bob@example.com") != token
+    assert Pseudonymiser(key="other", length=12)("ada@example.com") != token
+    assert pseudonymise({"b": 1, "a": 2}) == pseudonymise({"a": 2, "b": 1})
+    assert pseudonymise({1: "a", "b": 2}) == pseudonymise({1: "a", "b": 2})
+
+
+def test_pseudonymiser_reads_its_key_from_the_environment(monkeypatch):
+    monkeypatch.delenv("LOG_PII_HASH_KEY", raising=False)
+    with pytest.raises(ValueError):
+        Pseudonymiser()
+
+    monkeypatch.setenv("LOG_PII_HASH_KEY", "secret")
+    assert Pseudonymiser()("ada") == Pseudonymiser(key=b"secret")("ada")
+
+
+def test_redactor_pseudonymises_fields_and_patterns():
+    pseudonymise = Pseudonymiser(key="secret")
+    redactor = Redactor(
+        fields=["email_address"],
+        replacement=pseudonymise,
+        patterns={"email": (DEFAULT_PATTERNS["email"][0], pseudonymise)},
+    )
+
+    result = redactor.redact(
+        {"email_address": "ada@example.com", "note": "Sent to ada@example.com"}
+    )
+
+    token = pseudonymise("ada@example.com")
+    assert result == {"email_address": token, "note": "Sent to " + token}
@@ -0,0 +1,68 @@
+import json
+import logging
+from io import StringIO
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.handlers import RepeatCollapser
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_consecutive_repeats_are_collapsed():
+    stream = StringIO()
+    cazoo_logger.config(stream, collapse_repeats=True)
+
+    @ls.handler_logger("cloudwatch")
+    def handler(event, context, logger):
+        for i in range(3):
+            logger.info("Skipped record", extra={"reason": "duplicate"})
+        logger.info("Skipped record", extra={"reason": "invalid"})
+        logger.info("Finished")
+
+    handler(event, LambdaContext())
+
+    event_data, first, second, third = lines(stream)
+    assert event_data["msg"] == "Logging event data"
+    assert first["data"] == {"reason": "duplicate"}
+    assert first["repeat"]["count"] == 3
+    assert first["repeat"]["first"] <= first["repeat"]["last"]
+    assert second["data"] == {"reason": "invalid"}
+    assert "repeat" not in second
+    assert third["msg"] == "Finished"
+
+
+def test_errors_are_not_held_back():
+    stream = StringIO()
+    cazoo_logger.config(stream, collapse_repeats=True)
+    logger = cazoo_logger.empty()
+
+    logger.info("Retrying")
+    logger.info("Retrying")
+    logger.error("Gave up")
+
+    retrying, gave_up = lines(stream)
+    assert retrying["repeat"]["count"] == 2
+    assert gave_up["msg"] == "Gave up"
+
+
+def test_interpolated_messages_are_compared():
+    stream = StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(cazoo_logger.JsonFormatter())
+    collapser = RepeatCollapser(target)
+    logger = logging.Logger("repeats")
+    logger.addHandler(collapser)
+
+    logger.info("Record %s", 1)
+    logger.info("Record %s", 2)
+    logger.info("Record %s", 2)
+    collapser.flush()
+
+    assert [line["msg"] for line in lines(stream)] == ["Record 1", "Record 2"]
+    assert lines(stream)[1]["repeat"]["count"] == 2
@@ -0,0 +1,73 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from cazoo_logger.sampling import is_sampled, sample_rate_from_env, sampled_level
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+def test_sampling_is_deterministic_per_request():
+    request_ids = ["request-{0}".format(i) for i in range(1000)]
+
+    first = [is_sampled(request_id, 0.25) for request_id in request_ids]
+    second = [is_sampled(request_id, 0.25) for request_id in request_ids]
+
+    assert first == second
+    assert 200 < sum(first) < 300
+
+
+def test_rates_of_zero_and_one():
+    assert is_sampled("abc", 1)
+    assert not is_sampled("abc", 0)
+
+
+def test_sampled_out_invocations_log_warnings():
+    assert sampled_level("INFO", "abc", 0) == logging.WARNING
+    assert sampled_level("ERROR", "abc", 0) == logging.ERROR
+    assert sampled_level("DEBUG", "abc", 1) == logging.DEBUG
+
+
+@pytest.mark.parametrize("rate", ["2", "-0.5", "half"])
+def test_invalid_rates_fall_back_to_the_default_with_one_warning(monkeypatch, rate):
+    monkeypatch.setenv("LOG_SAMPLE_RATE", rate)
+
+    with pytest.warns(RuntimeWarning) as warned:
+        rates = [sample_rate_from_env(default=0.5) for _ in range(3)]
+
+    assert rates == [0.5, 0.5, 0.5]
+    assert len(warned) == 1
+
+
+def test_the_rate_is_read_again_when_it_changes(monkeypatch):
+    monkeypatch.setenv("LOG_SAMPLE_RATE", "0.25")
+    assert sample_rate_from_env() == 0.25
+
+    monkeypatch.setenv("LOG_SAMPLE_RATE", "0.75")
+    assert sample_rate_from_env() == 0.75
+
+
+@pytest.mark.parametrize(
+    "rate, expected", [("1", ["info", "warning"]), ("0", ["warning"])]
+)
+def test_init_logger_applies_the_sample_rate(monkeypatch, rate, expected):
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    monkeypatch.setenv("LOG_SAMPLE_RATE", rate)
+    stream = StringIO()
+    cazoo_logger.config(stream)
+
+    @ls.exception_logger("cloudwatch", has_pii=True)
+    def handler(event, context, logger):
+        logger.info("info")
+        logger.warning("warning")
+
+    handler(event, LambdaContext())
+
+    assert [json.loads(line)["msg"] for line in stream.getvalue().splitlines()] == (
+        expected
+    )
@@ -0,0 +1,96 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from cazoo_logger.contexts import ContextFragment
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.schema import DEFAULT_SCHEMA, Field, Schema
+
+
+def make_record(**attrs):
+    return logging.makeLogRecord(dict({"msg": "hi", "levelname": "INFO"}, **attrs))
+
+
+@pytest.mark.parametrize(
+    "attrs",
+    [
+        {},
+        {"type": "thing", "data": {"a": 1}},
+        {"context": {"request_id": "r"}, "data": {}},
+    ],
+)
+def test_default_schema_matches_the_generic_layout(attrs):
+    generic = JsonFormatter()
+    compiled = JsonFormatter(schema=DEFAULT_SCHEMA)
+    record = make_record(**attrs)
+
+    assert compiled.format(record) == generic.format(record)
+
+
+def test_default_schema_splices_the_cached_context():
+    context = {"request_id": "r"}
+    fragment = ContextFragment(context)
+    record = make_record(context=context, _context_fragment=fragment)
+    compiled = JsonFormatter(schema=DEFAULT_SCHEMA)
+
+    assert compiled.format(record) == JsonFormatter().format(record)
+    assert fragment.encode(compiled.encoder) == '{"request_id": "r"}'
+
+
+def test_the_context_can_be_written_twice():
+    context = {"request_id": "r"}
+    record = make_record(context=context, _context_fragment=ContextFragment(context))
+    schema = Schema(
+        Field("context"), Field("msg", optional=False), Field("ctx", source="context")
+    )
+
+    for truncate in (None, 1000):
+        formatter = JsonFormatter(schema=schema, truncate=truncate)
+
+        assert json.loads(formatter.format(record)) == {
+            "context": context,
+            "msg": "hi",
+            "ctx": context,
+        }
+
+
+def test_fields_can_be_renamed_and_reordered():
+    schema = Schema(
+        Field("severity", source="level", optional=False),
+        Field("message", source="msg", optional=False),
+        Field("payload", source="data"),
+        Field("request", source="context"),
+    )
+    formatter = JsonFormatter(schema=schema)
+    record = make_record(data={"a": 1}, context={"request_id": "r"})
+
+    assert formatter.format(record) == (
+        '{"severity": "info", "message": "hi", "payload": {"a": 1}, '
+        '"request": {"request_id": "r"}}'
+    )
+
+
+def test_required_fields_are_written_as_null():
+    schema = Schema(Field("msg", optional=False), Field("type", optional=False))
+    formatter = JsonFormatter(schema=schema)
+
+    assert json.loads(formatter.format(make_record())) == {"msg": "hi", "type": None}
+
+
+def test_exceptions_are_added_to_data():
+    formatter = JsonFormatter(schema=DEFAULT_SCHEMA)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(exc_info=sys.exc_info())
+
+    assert json.loads(formatter.format(record))["data"]["error"]["message"] == "boom"
+
+
+def test_invalid_schemas_fail():
+    with pytest.raises(ValueError):
+        Schema(Field("msg"), Field("msg"))
+    with pytest.raises(ValueError):
+        Field("msg", source="not an attribute")
@@ -0,0 +1,91 @@
+import dataclasses
+import enum
+import json
+import logging
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.serialisers import TypeRegistry, json_default
+
+
+class Colour(enum.Enum):
+    RED = "red"
+
+
+@dataclasses.dataclass
+class Vehicle:
+    vrm: str
+    registered: date
+
+
+def format_data(data, **kwargs):
+    formatter = JsonFormatter(**kwargs)
+    record = logging.makeLogRecord({"msg": "hi", "levelname": "INFO", "data": data})
+    return json.loads(formatter.format(record))["data"]
+
+
+def test_builtin_serialisers():
+    data = format_data(
+        {
+            "when": datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "day": date(2020, 1, 2),
+            "price": Decimal("9995.10"),
+            "id": uuid.UUID("66591d01-0241-5751-bb17-486e5a6dcf91"),
+            "colour": Colour.RED,
+            "tags": {"b", "a"},
+            "raw": b"caf\xc3\xa9 \xff",
+            "vehicle": Vehicle("LP12 KZM", date(2012, 3, 1)),
+        }
+    )
+
+    assert data == {
+        "when": "2020-01-02T03:04:05+00:00",
+        "day": "2020-01-02",
+        "price": "9995.10",
+        "id": "66591d01-0241-5751-bb17-486e5a6dcf91",
+        "colour": "red",
+        "tags": ["a", "b"],
+        "raw": "café \\xff",
+        "vehicle": {"vrm": "LP12 KZM", "registered": "2012-03-01"},
+    }
+
+
+def test_accelerated_encoder_uses_the_same_serialisers():
+    data = {"when": datetime(2020, 1, 2), "vehicle": Vehicle("LP12 KZM", None)}
+
+    assert format_data(data, encoder="auto") == format_data(data)
+
+
+def test_unknown_types_are_coerced_to_strings():
+    class Thing:
+        def __str__(self):
+            return "a thing"
+
+    assert json_default(Thing()) == "a thing"
+
+
+def test_registered_types_apply_to_subclasses():
+    class Money:
+        def __init__(self, amount):
+            self.amount = amount
+
+    class Pounds(Money):
+        pass
+
+    registry = json_default.copy()
+    registry.register(Money, lambda value: {"amount": value.amount})
+
+    assert registry(Pounds(5)) == {"amount": 5}
+    assert json_default(Pounds(5)) != {"amount": 5}
+
+
+def test_register_as_a_decorator():
+    registry = TypeRegistry()
+
+    @registry.register(complex)
+    def serialise_complex(value):
+        return [value.real, value.imag]
+
+    assert format_data({"z": 1 + 2j}, json_default=registry) == {"z": [1.0, 2.0]}
@@ -165,3 +165,20 @@ def test_decorated_function_with_s3_creates_logs():
     assert result["msg"] == "Logging a test message"
     assert result["data"]["vrm"] == "LP12 KZM"
     assert result["level"] == "info"
+
+
+def test_handler_logger_filter_does_not_accumulate():
+    event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+    ctx = LambdaContext("abc-123", "testing-the-decorator", "brand-new")
+    filters = []
+
+    @ls.handler_logger("cloudwatch", log_filter=PiiFilter)
+    def handler(event, context, logger):
+        filters.append(list(logging.root.filters))
+
+    for _ in range(3):
+        handler(event, ctx)
+
+    assert [len(attached) for attached in filters] == [1, 1, 1]
+    assert filters[0][0] is filters[2][0]
+    assert logging.root.filters == []
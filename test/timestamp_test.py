@@ -0,0 +1,64 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+
+import cazoo_logger
+from cazoo_logger.formatters import JsonFormatter, TimestampFormatter
+
+
+def record_at(created):
+    record = logging.makeLogRecord({"msg": "hi", "levelname": "INFO"})
+    record.created = created
+    return record
+
+
+def test_timestamps_are_off_by_default(monkeypatch):
+    formatter = JsonFormatter()
+    monkeypatch.setattr(formatter, "formatTime", None)
+
+    assert "timestamp" not in json.loads(formatter.format(record_at(0.0)))
+
+
+@pytest.mark.parametrize(
+    "precision, expected",
+    [
+        ("s", "2019-03-01T01:23:45Z"),
+        ("ms", "2019-03-01T01:23:45.678Z"),
+        ("us", "2019-03-01T01:23:45.678901Z"),
+    ],
+)
+def test_timestamp_precision(precision, expected):
+    formatter = JsonFormatter(timestamp=precision)
+    result = json.loads(formatter.format(record_at(1551403425.678901)))
+
+    assert result["timestamp"] == expected
+
+
+def test_seconds_prefix_is_cached_and_refreshed():
+    timestamps = TimestampFormatter("ms")
+
+    assert timestamps(1551403425.001) == "2019-03-01T01:23:45.001Z"
+    assert timestamps(1551403425.999) == "2019-03-01T01:23:45.999Z"
+    assert timestamps(1551403426.5) == "2019-03-01T01:23:46.500Z"
+
+
+def test_datefmt_formats_the_seconds():
+    timestamps = TimestampFormatter("s", datefmt="%d/%m/%Y %H:%M:%S")
+
+    assert timestamps(1551403425.5) == "01/03/2019 01:23:45Z"
+
+
+def test_invalid_precision_fails():
+    with pytest.raises(ValueError):
+        TimestampFormatter("ns")
+
+
+def test_config_with_timestamps():
+    stream = StringIO()
+    cazoo_logger.config(stream, timestamp="ms")
+
+    cazoo_logger.empty().info("hello")
+
+    assert json.loads(stream.getvalue())["timestamp"].endswith("Z")
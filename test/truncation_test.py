@@ -0,0 +1,160 @@
+import json
+import logging
+from io import StringIO
+
+import cazoo_logger
+from cazoo_logger import encoders
+from cazoo_logger.formatters import JsonFormatter
+from cazoo_logger.schema import DEFAULT_SCHEMA
+from cazoo_logger.truncation import Truncator
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+def test_values_that_fit_are_returned_as_is():
+    value = {"a": [1, 2, {"b": "c"}], "d": "e" * 100}
+
+    assert Truncator().truncate(value) is value
+
+
+def test_long_strings_are_cut():
+    result = Truncator(max_string=10).truncate({"a": "x" * 25, "b": "short"})
+
+    assert result == {"a": "x" * 10 + "...[15 chars truncated]", "b": "short"}
+
+
+def test_long_lists_keep_their_first_items():
+    value = {"items": list(range(1000)), "small": [1, 2, 3]}
+
+    result = Truncator(max_items=100, keep_items=3).truncate(value)
+
+    assert result["items"] == [0, 1, 2, "[997 more items truncated]"]
+    assert result["small"] is value["small"]
+
+
+def test_deep_values_are_summarised():
+    value = {"a": {"b": {"c": {"d": 1}}, "e": [[1, 2]]}}
+
+    result = Truncator(max_depth=2).truncate(value)
+
+    assert result == {
+        "a": {
+            "b": "[dict with 1 keys truncated]",
+            "e": "[list with 1 items truncated]",
+        }
+    }
+
+
+def test_the_budget_cuts_the_rest_of_the_value():
+    value = {"first": "x" * 50, "second": "y" * 500, "third": "z" * 50}
+
+    result, remaining = Truncator().fit(value, 300)
+
+    assert result["first"] == value["first"]
+    assert result["second"].startswith("y" * 10)
+    assert result["second"].endswith("chars truncated]")
+    assert result["..."] == "[1 more keys truncated]"
+    assert len(json.dumps(result)) <= 300
+    assert remaining == 300 - len(json.dumps(result)) - 2
+
+
+def test_non_ascii_strings_are_measured_as_encoded():
+    value = {"name": ["é" * 15000] * 20}
+
+    for ensure_ascii in (True, False):
+        result = Truncator(ensure_ascii=ensure_ascii).truncate(value, 10000)
+
+        line = json.dumps(result, ensure_ascii=ensure_ascii).encode("utf-8")
+        assert 9000 < len(line) <= 10000
+
+
+def test_long_keys_are_measured():
+    value = {"k" * 170 + str(i): i for i in range(20000)}
+
+    result = Truncator().truncate(value, 10000)
+
+    assert 9000 < len(json.dumps(result)) <= 10000
+    assert result["..."].endswith("more keys truncated]")
+
+
+def test_budget_stops_walking_long_lists():
+    value = [{"n": i, "s": "x" * 100} for i in range(50)]
+
+    result = Truncator(max_items=100).truncate(value, 1000)
+
+    assert len(result) < 12
+    assert result[-1] == "[{0} more items truncated]".format(51 - len(result))
+
+
+def _format(formatter, **extra):
+    log = cazoo_logger.cloudwatch(event, LambdaContext())
+    _, kwargs = log.process("Big " + "m" * 5000, {"extra": extra})
+    record = logging.makeLogRecord(dict(kwargs["extra"], levelname="INFO"))
+    record.msg = "Big " + "m" * 5000
+    return formatter.format(record)
+
+
+def test_formatter_keeps_lines_within_the_budget():
+    payload = {"rows": [{"id": i, "name": "x" * 200} for i in range(5000)]}
+
+    for schema in (None, DEFAULT_SCHEMA):
+        formatter = JsonFormatter(
+            schema=schema, truncate=Truncator(max_bytes=20000, max_string=1000)
+        )
+        line = _format(formatter, **payload)
+
+        assert len(line.encode("utf-8")) <= 20000
+        result = json.loads(line)
+        assert result["msg"].endswith("[4004 chars truncated]")
+        assert result["context"]["request_id"] == "request_id"
+        assert result["data"]["rows"][0] == payload["rows"][0]
+
+
+def test_config_truncates():
+    stream = StringIO()
+    cazoo_logger.config(stream, truncate=1000)
+
+    cazoo_logger.empty().info("Exported", extra={"rows": ["x" * 100] * 50})
+
+    line = stream.getvalue().rstrip("\n")
+    assert len(line) <= 1000
+    assert json.loads(line)["data"]["rows"][-1].endswith("more items truncated]")
+
+
+def test_lines_stay_within_the_budget_for_every_encoder():
+    context = {"key" + str(i): "ü" * 300 for i in range(40)}
+    data = {"€" * 175 + str(i): "🙂" * 100 for i in range(1000)}
+
+    for encoder in (encoders.StdlibEncoder(), encoders.get_encoder("auto")):
+        for schema in (None, DEFAULT_SCHEMA):
+            formatter = JsonFormatter(encoder=encoder, schema=schema, truncate=10000)
+            line = formatter.format_bytes(
+                logging.makeLogRecord(
+                    {"msg": "ß" * 3000, "context": context, "data": data}
+                )
+            )
+
+            assert 8000 < len(line) <= 10000
+            result = json.loads(line)
+            assert result["data"]["..."].endswith("more keys truncated]")
+
+
+def test_every_field_counts_towards_the_budget():
+    for schema in (None, DEFAULT_SCHEMA):
+        stream = StringIO()
+        cazoo_logger.config(
+            stream, truncate=1000, timestamp="us", collapse_repeats=True, schema=schema
+        )
+        log = cazoo_logger.cloudwatch(event, LambdaContext())
+
+        for _ in range(3):
+            log.info("Long " + "m" * 2000)
+        log.info("Typed", type="t" * 3000)
+        log.error("Done")
+
+        long, typed, _ = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert all(len(line) <= 1000 for line in stream.getvalue().splitlines())
+        assert long["repeat"]["count"] == 3
+        assert long["msg"].endswith("chars truncated]")
+        assert typed["type"].endswith("chars truncated]")
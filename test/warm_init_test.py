@@ -0,0 +1,112 @@
+import json
+import logging
+from io import StringIO
+
+import cazoo_logger
+from cazoo_logger import lambda_support as ls
+from . import LambdaContext
+
+event = {"source": "test_event", "detail-type": "test event", "id": "12345"}
+
+
+def test_config_with_the_same_settings_reuses_the_handler():
+    stream = StringIO()
+    cazoo_logger.config(stream)
+    handler = logging.root.handlers[0]
+
+    cazoo_logger.config(stream)
+
+    assert logging.root.handlers == [handler]
+
+
+def test_config_with_new_settings_rebuilds_the_handler():
+    stream = StringIO()
+    cazoo_logger.config(stream)
+    handler = logging.root.handlers[0]
+
+    cazoo_logger.config(StringIO())
+    assert logging.root.handlers != [handler]
+
+    handler = logging.root.handlers[0]
+    cazoo_logger.config(logging.root.handlers[0].stream, timestamp="ms")
+    assert logging.root.handlers != [handler]
+
+
+def test_config_rebuilds_a_handler_that_was_removed():
+    stream = StringIO()
+    cazoo_logger.config(stream)
+    logging.root.handlers.clear()
+
+    cazoo_logger.config(stream)
+
+    assert len(logging.root.handlers) == 1
+
+
+def test_level_changes_apply_to_the_reused_handler():
+    stream = StringIO()
+    cazoo_logger.config(stream, level=logging.INFO)
+    handler = logging.root.handlers[0]
+
+    cazoo_logger.config(stream, level=logging.DEBUG)
+    cazoo_logger.empty().debug("visible")
+
+    assert logging.root.handlers == [handler]
+    assert json.loads(stream.getvalue())["msg"] == "visible"
+
+
+def test_level_changes_apply_to_a_reused_flight_recorder():
+    stream = StringIO()
+    cazoo_logger.config(stream, level=logging.INFO, flight_recorder=10)
+    recorder = logging.root.handlers[0]
+
+    cazoo_logger.config(stream, level=logging.WARNING, flight_recorder=10)
+
+    assert logging.root.handlers == [recorder]
+    assert recorder.record_level == logging.WARNING
+
+
+def test_warm_invocations_keep_the_handler(monkeypatch, capsys):
+    monkeypatch.delenv("LOG_SAMPLE_RATE", raising=False)
+    # As in a fresh container, where config() hasn't been called.
+    monkeypatch.setattr(cazoo_logger, "_configured", None)
+
+    handlers = []
+
+    @ls.handler_logger(context_type="cloudwatch")
+    def handler(event, context, log):
+        log.info("handled")
+        handlers.append(logging.root.handlers[0])
+
+    handler(event, LambdaContext(request_id="first"))
+    handler(event, LambdaContext(request_id="second"))
+
+    assert handlers[0] is handlers[1]
+    lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    request_ids = [line["context"]["request_id"] for line in lines]
+    assert request_ids == ["first"] * 2 + ["second"] * 2
+
+
+def test_invocations_keep_the_settings_config_was_called_with(monkeypatch):
+    monkeypatch.delenv("LOG_SAMPLE_RATE", raising=False)
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    stream = StringIO()
+    # As at import time, before the handler is decorated.
+    cazoo_logger.config(
+        stream, level=logging.DEBUG, timestamp="ms", redact=["email_address"]
+    )
+    installed = logging.root.handlers[0]
+
+    @ls.handler_logger(context_type="cloudwatch")
+    def handler(event, context, log):
+        log.debug("hidden")
+        log.info("handled", extra={"email_address": "someone@example.com"})
+
+    handler(event, LambdaContext(request_id="first"))
+    handler(event, LambdaContext(request_id="second"))
+
+    assert logging.root.handlers == [installed]
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["msg"] for line in lines] == ["Logging event data", "handled"] * 2
+    assert all("timestamp" in line for line in lines)
+    assert lines[1]["data"]["email_address"] == "PII REMOVED"
+    assert lines[3]["context"]["request_id"] == "second"